@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of the cog command argument parser.
+
+Compares `CogCommandWrapper.invoke` (signature compiled once, see `CogCommandWrapper.parse`) with the
+former approach, which split the message and looked the converters up on every call.
+
+    python examples/benchmarks/command_parser.py
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")) # run from a checkout
+
+from linelib.ext.commands import CogCommandWrapper
+from linelib.ext.rule import DEFAULT_RULE
+
+RUNS = 7 # best of
+CALLS = 50_000
+
+
+class Ctx:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class LegacyWrapper:
+    """
+    The parser before signatures were compiled. (for reference only)
+    """
+    def __init__(self, func):
+        self.func = func
+        self.rule = DEFAULT_RULE.emit
+        self.ann = []
+        for index, (name, param) in enumerate(inspect.signature(func).parameters.items()):
+            if index < 2: # self, ctx
+                continue
+            if param.kind == inspect.Parameter.KEYWORD_ONLY:
+                self.ann.append(('*', name))
+            else:
+                self.ann.append((str if param.annotation is inspect._empty else param.annotation,))
+
+    async def emit(self, o, ctx):
+        args = ctx.content.strip().split(' ')[1:]
+        if not self.rule(ctx):
+            return
+        _PASS = []
+        _NAMED = {}
+        for i in range(len(args)):
+            if (i + 1) > len(self.ann):
+                break
+            if self.ann[i][0] != '*':
+                _PASS.append(self.ann[i][0](args[i]))
+            else:
+                _NAMED[self.ann[i][1]] = ' '.join(args[i:])
+        try:
+            await self.func(o, ctx, *_PASS, **_NAMED)
+        except Exception:
+            raise
+
+
+async def three(self, ctx, a: int, b: float, c: str): pass
+async def four(self, ctx, a: int, b: float, c: str, d: int): pass
+async def tail(self, ctx, a: int, b: float, c: str, d: bool, *, rest): pass
+
+CASES = [
+    ("3 args", three, "cmd 12 3.5 hello"),
+    ("4 args", four, "cmd 12 3.5 hello 7"),
+    ("4 args + tail", tail, "cmd 12 3.5 hello yes the rest of it")
+]
+
+
+async def best(call) -> float:
+    """Microseconds per call, best of `RUNS`."""
+    result = float('inf')
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            await call()
+        result = min(result, (time.perf_counter() - start) / CALLS * 1e6)
+    return result
+
+
+async def main():
+    for label, func, content in CASES:
+        ctx = Ctx(content)
+        legacy = LegacyWrapper(func)
+        compiled = CogCommandWrapper("cmd", func)
+
+        before = await best(lambda: legacy.emit(None, ctx))
+        after = await best(lambda: compiled.invoke(None, ctx, ctx.content.strip().partition(' ')[2]))
+        print(f"{label:<14} before {before:6.2f} us   after {after:6.2f} us   ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
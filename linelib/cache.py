@@ -0,0 +1,253 @@
+"""
+Bounded, time-based caches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator
+
+# const
+_MISSING = object()
+
+
+class TTLCache:
+  """
+  A bounded mapping. Each entry expires `ttl` seconds after it was set, and the least recently used entry is evicted once `maxsize` is reached.
+
+  `maxsize` : int | None
+
+  Maximum number of entries. `None` for no limit.
+
+  `ttl` : float | None
+
+  Seconds before an entry expires. `None` for no expiry.
+
+  **Example**
+  ```py
+  cache = TTLCache(maxsize=1024, ttl=60)
+  cache['key'] = 'value'
+
+  cache.get('key') # 'value'
+  cache.hits, cache.misses # 1, 0
+  ```
+  """
+
+  def __init__(self, maxsize: int | None = 1024, ttl: float | None = 300.0):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.hits: int = 0
+    self.misses: int = 0
+    self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+  def _lookup(self, key: Hashable) -> Any:
+    item = self._data.get(key, _MISSING)
+    if item is _MISSING:
+      return _MISSING
+
+    expires, value = item
+    if expires is not None and expires <= time.monotonic():
+      del self._data[key]
+      return _MISSING
+
+    self._data.move_to_end(key)
+    return value
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """
+    Returns the value of `key`, or `default` if it is missing or has expired.
+    """
+    value = self._lookup(key)
+    if value is _MISSING:
+      self.misses += 1
+      return default
+
+    self.hits += 1
+    return value
+
+  def set(self, key: Hashable, value: Any, ttl: float | None = _MISSING) -> None:
+    """
+    Sets `key` to `value`. `ttl` overrides the default expiry of this entry.
+    """
+    now = time.monotonic()
+    ttl = self.ttl if ttl is _MISSING else ttl
+    self._data[key] = (None if ttl is None else now + ttl, value)
+    self._data.move_to_end(key)
+
+    # reclaim (up to two) expired entries from the least recently used end,
+    # so idle keys do not pile up even if they are never read again
+    for _ in range(2):
+      if not self._data:
+        break
+      oldest = next(iter(self._data))
+      expires = self._data[oldest][0]
+      if expires is None or expires > now:
+        break
+      del self._data[oldest]
+
+    if self.maxsize is not None:
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+
+  def pop(self, key: Hashable, default: Any = None) -> Any:
+    value = self._lookup(key)
+    self._data.pop(key, None)
+    return default if value is _MISSING else value
+
+  def expire(self) -> int:
+    """
+    Removes every expired entry, then returns how many were removed.
+    """
+    now = time.monotonic()
+    expired = [key for key, (expires, _) in self._data.items() if expires is not None and expires <= now]
+    for key in expired:
+      del self._data[key]
+    return len(expired)
+
+  def clear(self) -> None:
+    self._data.clear()
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "size": len(self._data),
+      "maxsize": self.maxsize,
+      "ttl": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses
+    }
+
+  def __getitem__(self, key: Hashable) -> Any:
+    value = self.get(key, _MISSING)
+    if value is _MISSING:
+      raise KeyError(key)
+    return value
+
+  def __setitem__(self, key: Hashable, value: Any) -> None:
+    self.set(key, value)
+
+  def __delitem__(self, key: Hashable) -> None:
+    if self._lookup(key) is _MISSING:
+      raise KeyError(key)
+    del self._data[key]
+
+  def __contains__(self, key: Hashable) -> bool:
+    return self._lookup(key) is not _MISSING
+
+  def __len__(self) -> int:
+    return len(self._data)
+
+  def __iter__(self) -> Iterator[Hashable]:
+    return iter(list(self._data))
+
+  def __repr__(self) -> str:
+    return f"<TTLCache size={len(self._data)} maxsize={self.maxsize} ttl={self.ttl}>"
+
+
+class Sweeper:
+  """
+  Periodically removes the expired entries of some `TTLCache`s, so that entries which are never read again (e.g., untapped postback buttons) do not pile up.
+
+  `caches` : dict[str, TTLCache | Callable[[], TTLCache]]
+
+  The caches to sweep, by name. A function is called at each sweep to get the cache, for caches that may be replaced. (e.g., `Tmp.use(backend)`)
+
+  `interval` : float
+
+  Seconds between two sweeps.
+
+  Caches backed by a database (`blocking = True`, e.g., a `SQLiteNamespace`) are swept and counted in a worker thread, so the event loop never waits on them.
+
+  **Example**
+  ```py
+  sweeper = Sweeper({"actions": Tmp.action_storage}, interval=60)
+  sweeper.start() # on a running event loop
+
+  sweeper.gauges # {"actions": 42}
+  ```
+  """
+
+  def __init__(self, caches: dict[str, TTLCache], interval: float = 60.0):
+    self.caches = caches
+    self.interval = interval
+    self.sweeps: int = 0
+    self.removed: int = 0
+    self._counts: dict[str, int] = {} # of blocking caches, as of the last sweep
+    self._task: asyncio.Task | None = None
+
+  def start(self) -> None:
+    """
+    Starts sweeping on the running event loop. (Only once.)
+    """
+    if self._task is not None and not self._task.done():
+      return
+
+    self._task = asyncio.get_running_loop().create_task(self._sweep())
+
+  async def _sweep(self):
+    while True:
+      await asyncio.sleep(self.interval)
+      await self.asweep()
+
+  def sweep(self) -> int:
+    """
+    Sweeps every cache at once, then returns how many entries were removed.
+    """
+    removed = sum(cache.expire() for cache in self.current.values())
+    self.sweeps += 1
+    self.removed += removed
+    return removed
+
+  async def asweep(self) -> int:
+    """
+    Same as `sweep`, but blocking caches are swept (and counted) in a worker thread.
+    """
+    removed = 0
+    for name, cache in self.current.items():
+      if getattr(cache, 'blocking', False):
+        expired, self._counts[name] = await asyncio.to_thread(_expireAndCount, cache)
+        removed += expired
+      else:
+        removed += cache.expire()
+
+    self.sweeps += 1
+    self.removed += removed
+    return removed
+
+  async def close(self) -> None:
+    if self._task is not None:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+
+  @property
+  def current(self) -> dict[str, TTLCache]:
+    """
+    The caches that are swept right now, by name.
+    """
+    return {name: cache() if callable(cache) else cache for name, cache in self.caches.items()}
+
+  @property
+  def gauges(self) -> dict:
+    """
+    Current number of entries of each cache. (of blocking caches: as of the last sweep)
+    """
+    return {
+      name: self._counts.get(name, 0) if getattr(cache, 'blocking', False) else len(cache)
+      for name, cache in self.current.items()
+    }
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "gauges": self.gauges,
+      "interval": self.interval,
+      "sweeps": self.sweeps,
+      "removed": self.removed
+    }
+
+
+def _expireAndCount(cache) -> tuple[int, int]:
+  return cache.expire(), len(cache)
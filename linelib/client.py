@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import asyncio  # pip install asyncio
 import base64
+import functools
 import hashlib
 import hmac
+import json
 import logging
 import random
+import threading
 import time
+import uuid
 from inspect import iscoroutinefunction, isfunction
-from typing import Any, Callable, Union
+from typing import Any, AsyncIterable, Callable, Iterable, Union
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS  # pip install flask-cors
@@ -17,12 +21,22 @@ from termcolor import colored, cprint
 from .construct import (
   EventObject, 
   getContext, 
+  getSourceKey, 
   getTriggerType, 
   modifiable
 )
 
+from .cache import Sweeper, TTLCache
+from .connect import gate
+from .connect.limit import Limiter
+from .connect.session import Session
+from .dispatch import EventQueue
+from .ext.commands import CommandRouter
+from .model.new import dumpMessages
+from .outbox import Outbox
 from .exceptions import Async as AsyncError
 from .exceptions import Invalid
+from .postback import Route, RouteTable
 from .tmp import Tmp
 
 # const
@@ -32,6 +46,56 @@ prefix = colored('linelib v2', 'light_green')
 class Client:
   """
   Represents a Client.
+
+  `**options` - Client options. Outbound LINE API calls share one keep-alive connection pool (`Client.session`), configured with:
+
+  - `max_connections` (default: `100`)
+  - `max_keepalive_connections` (default: `20`)
+  - `keepalive_expiry` (seconds, default: `30.0`)
+  - `timeout` (seconds, default: `10.0`)
+
+  Outbound calls are rate limited per endpoint class (`reply`, `push`, `multicast`, `broadcast`, `profile`, `content`); 429s and 5xxs are retried after `Retry-After`, or a jittered exponential backoff. Configured with:
+
+  - `rate_limits` - e.g., `{"push": (500, 500)}` for 500 requests per second, in bursts of up to 500. (see `linelib.connect.limit.RATE_LIMITS`)
+  - `retries` (default: `5`)
+  - `backoff` (seconds, default: `0.5`)
+
+  User profiles are cached (`Client.profile_cache`), configured with:
+
+  - `profile_cache_size` (default: `1024`)
+  - `profile_cache_ttl` (seconds, default: `300.0`)
+
+  Groups fetched by `ctx.get_group()` are cached (`Client.group_cache`) until a member joins or leaves, or the bot leaves the group, configured with:
+
+  - `group_cache_size` (default: `256`)
+  - `group_cache_ttl` (seconds, default: `60.0`)
+
+  `ordered_sources` - Events of one webhook request are handled concurrently. Set this to `True` to keep events from the same user, group or room in delivery order. (default: `False`)
+
+  `ack` - `'after'` (default) acknowledges a webhook after its handlers finish. `'immediate'` acknowledges it as soon as its events are queued; a pool of workers (`Client.queue`) handles them in the background, configured with:
+
+  - `workers` (default: `4`)
+  - `queue_size` (default: `0`, no limit)
+
+  `ctx.author` is fetched lazily (`await ctx.author`). Set `eager_author=True` to fetch it before the event handlers run.
+
+  Items and handlers of postback actions (`action.remember(...)`, `@action.handle()`) are removed once the button is tapped; buttons that are never tapped expire. Configured with:
+
+  - `action_ttl` (seconds, default: `86400.0`)
+  - `action_max_entries` (default: `10000`)
+  - `sweep_interval` (seconds, default: `60.0`) - how often expired entries are removed in the background. (`Client.sweeper`; see `Client.sweeper.gauges` for the current sizes)
+
+  `postback_secret` - The key that signs the payloads of postback routes. (`Route.pack`; default: the channel secret)
+
+  `outbox` - An `Outbox(path)` (see `linelib.outbox`). Replies, pushes, multicasts and broadcasts are written to it first, then delivered by a background worker, with retries even across restarts. They return the dedupe key of the send (or the keys of each multicast request) instead of the response.
+
+  Events redelivered by LINE (e.g., after a slow acknowledgement) are dropped if they were already handled, by their `webhookEventId`. Configured with:
+
+  - `dedupe_events` (default: `True`)
+  - `dedupe_window` (seconds, default: `3600.0`) - how long an event ID is remembered.
+  - `dedupe_size` (default: `100000`)
+
+  `state` - Where stored action items, seen event IDs and rule states (cooldowns, usage limits, ...) are kept. `MemoryBackend()` (default) keeps them in this process; `SQLiteBackend(path)` shares them between the worker processes of this machine, and keeps them across restarts. (see `linelib.state`)
   """
 
   # public:
@@ -47,9 +111,9 @@ class Client:
     self.CS = channel_secret
     self.CAT = channel_access_token
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    self.loop = loop  # if it is required
+    # the persistent loop of the Flask server (see `_ll_start_loop`)
+    # with `server='asgi'`, the server's own loop is used instead
+    self.loop = asyncio.new_event_loop()
 
     for e in self._VALID_EVENTS:
       self._EVENTS[e] = []  # waiting for append
@@ -63,46 +127,122 @@ class Client:
       "Content-Type": "application/json"
     }  # for quick access, yeah
 
+    self.session = Session(
+      {"Authorization": f"Bearer {self.CAT}"},
+      **{
+        k: options[k] for k in (
+          "max_connections", "max_keepalive_connections", "keepalive_expiry", "timeout"
+        ) if k in options
+      },
+      limiter=Limiter(
+        options.get("rate_limits"),
+        **{k: options[k] for k in ("retries", "backoff") if k in options}
+      )
+    )
+
+    self.profile_cache = TTLCache(
+      options.get("profile_cache_size", 1024),
+      options.get("profile_cache_ttl", 300.0)
+    )
+
+    self.group_cache = TTLCache(
+      options.get("group_cache_size", 256),
+      options.get("group_cache_ttl", 60.0)
+    )
+
+    if options.get("state") is not None:
+      Tmp.use(options["state"])
+
+    for cache in (Tmp.action_storage, Tmp.self_handler):
+      cache.ttl = options.get("action_ttl", 86400.0)
+      cache.maxsize = options.get("action_max_entries", 10000)
+
+    self.dedupe_events: bool = options.get("dedupe_events", True)
+    Tmp.seen_events.ttl = options.get("dedupe_window", 3600.0)
+    Tmp.seen_events.maxsize = options.get("dedupe_size", 100000)
+
+    # looked up at each sweep, as `Tmp.use(backend)` may replace them later
+    self.sweeper = Sweeper({
+      **{name: functools.partial(getattr, Tmp, name) for name in (
+        "action_storage", "self_handler", "rule_cooldown", "rule_usage", "rule_rate", "seen_events"
+      )},
+      "profile_cache": self.profile_cache,
+      "group_cache": self.group_cache
+    }, options.get("sweep_interval", 60.0))
+
+    self.ordered_sources: bool = options.get("ordered_sources", False)
+    self.eager_author: bool = options.get("eager_author", False)
+
+    self.queue: EventQueue | None = EventQueue(
+      self,
+      options.get("workers", 4),
+      options.get("queue_size", 0),
+      self.ordered_sources
+    ) if options.get("ack", "after") == "immediate" else None
+    self._ll_thread: threading.Thread | None = None
+
+    self.router: CommandRouter | None = None  # see `load_cog`
+    self.outbox: Outbox | None = options.get("outbox")
+    self.routes = RouteTable(options.get("postback_secret", channel_secret))  # see `route`
+
+    self._ll_START = time.time()
+    self._ll_options = {}
+
   def createEvent(self, name: str, obj: type):
     self._EVENTS[name].append(obj)
 
+  async def emit(self, name: str, *args: Any, **kwargs: Any):
+    """
+    Emits the event handlers of `name` on the running event loop.
+    """
+    if name == 'postback':
+      await self.routes.dispatch(*args, **kwargs)
+
+    cache = self._EVENTS[name]
+    for handler in cache:
+      if not name in ('ready', ):
+        if handler.type == 'postback':
+          func = Tmp.self_handler.pop(getattr(args[0], 'data', None))
+          if func:
+            await func(*args, **kwargs)
+      await handler.emit(*args, **kwargs)
+
+      if not name in ('ready', ):
+        # args[0] => the context
+
+        if getattr(args[0], "TYPE", None) in ['postback', 'datetime', 'rich_menu_switch']:
+          Tmp.action_storage.pop(args[0].data) # already expired? that's fine
+
   def emitEvents(self, name: str, *args: Any, **kwargs: Any):
+    self._ll_submit(self.emit(name, *args, **kwargs))
+
+  def _ll_submit(self, coro):
+    """
+    Runs `coro` on `Client.loop` from a synchronous (Flask) thread, then returns its result.
+    """
+    self._ll_start_loop()
+    return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
 
-    async def goOver():
-      cache = self._EVENTS[name]
-      done = []
-      for handler in cache:
-        async def doTask():
-          if not name in ('ready', ):
-            if handler.type == 'postback':
-              func = getattr(args[0], 'data', None)
-              if func:
-                await Tmp.self_handler[func](*args, **kwargs)
-                del Tmp.self_handler[func]
-          await handler.emit(*args, **kwargs)
-
-          if not name in ('ready', ):
-            # args[0] => the context
-              
-            if getattr(args[0], "TYPE", None) in ['postback', 'datetime', 'rich_menu_switch']:
-              try:
-                del Tmp.action_storage[args[0].data]
-              except Exception as err:
-                print(f"\n\n{prefix} - {colored('Unknown Exception ~ TMP_DATA_DELETE', 'red')}:\n{err}\n\n")
-
-
-          return  # finished, ends the complete task! B)
-        
-        task = asyncio.create_task(doTask())
-        await task
-
-        done.append(task)  # task completed
-      res = asyncio.gather(*done)
-      return res  # initial response
-
-    loop = self.loop
-    task = loop.create_task(goOver())
-    loop.run_until_complete(task)
+  def _ll_start_loop(self):
+    """
+    Runs `Client.loop` forever in a background thread. (Only once.)
+
+    Every webhook, context and handler of the Flask server runs on this one loop, which also keeps the pooled connections and the queued events alive between requests.
+    """
+    if self._ll_thread is not None:
+      return
+
+    self._ll_thread = threading.Thread(target=self.loop.run_forever, name="linelib-loop", daemon=True)
+    self._ll_thread.start()
+    self.loop.call_soon_threadsafe(self.sweeper.start)
+
+  def _ll_stop_loop(self):
+    if self._ll_thread is None:
+      return
+
+    self.loop.call_soon_threadsafe(self.loop.stop)
+    self._ll_thread.join()
+    self._ll_thread = None
 
   def event(self,
             listener: Union[str, Callable] = FUNCTION_NAME_OR_LISTENER,
@@ -145,6 +285,36 @@ class Client:
     # required
     return wrapper
 
+  def route(self, name: str = FUNCTION_NAME_OR_LISTENER) -> Callable[[Callable], Route]:
+    """
+    Registers a named postback route. The postback `data` carries the route name and its arguments, so a tap is handled by any worker process, even after a restart.
+
+    ```py
+    @client.route('vote')
+    async def vote(ctx, choice):
+      await ctx.reply(f"You voted for {choice}!")
+
+    PostbackAction(label="Yes", data=vote.data("yes"))
+    ```
+
+    Use `vote.pack(choice="yes")` for typed, signed arguments. (`ctx.payload`)
+    """
+    if isfunction(name):
+      raise Invalid(
+        "Invalid Route",
+        f"Routes are registered with `@client.route()`. Make sure to add the '()' to '{name.__name__}' in order to work."
+      )
+
+    def wrapper(func):
+      if not (iscoroutinefunction(func)):
+        raise AsyncError(
+          "Async Error",
+          f"Function '{func.__name__}(...)' should be an async function.")
+
+      return self.routes.add(func.__name__ if name == "@see-func" else name, func)
+
+    return wrapper
+
   @modifiable(req=dict)  # skip
   def request_then(self, req):
     pass  # default
@@ -165,6 +335,8 @@ class Client:
     Runs the LINE bot.
 
     `**options` - Arguments & options. Note that you must use named options, such as `log_level=ERROR`, `host='0.0.0.0'`, etc.
+
+    `server` - `'flask'` (default), or `'asgi'` to serve `Client.asgi` with uvicorn on a single event loop. *(Requires `pip install uvicorn`)*
     """
 
     @self.app.route("/", methods=['GET', 'POST'])
@@ -174,11 +346,7 @@ class Client:
 
       signature = request.headers.get('X-Line-Signature')
       body = request.get_data(as_text=True)
-      hash = hmac.new(self.CS.encode('utf-8'), body.encode('utf-8'),
-                      hashlib.sha256).digest()
-      valid = hmac.compare_digest(signature.encode("utf-8"),
-                                  base64.b64encode(hash))
-      if not valid:
+      if not self.verify(body, signature):
         raise Invalid(
           "Invalid Signature",
           f"\n\nAn invalid request was received. INFO:\nUser-Agent: {request.headers.get('User-Agent')}\nSignature Received: {signature}\nBody:\n{body}"
@@ -187,45 +355,13 @@ class Client:
       req: dict = request.json
 
       self.request_then(req)
-
-      # requested
-      for payload in req['events']:
-        print(payload)
-        t = getTriggerType(payload)
-        context: type = getContext(
-          t,
-          self,
-          payload  # duplicate
-        )  # update: NOT *getContext(...)
-        self.payload_then(context)
-        self.emitEvents(t, context)
-
-      if req['events'] == []:  # empty array
-        cprint("\n\n🎉 Surprise!", "light_green")
-        cprint(
-          "Congratulations on your success — your webhook URL has been verified by LINE.\n\n"
-        )
-        return jsonify({"status": "Okay"})
-
-      return jsonify({"status": "OK", "message": "Request accepted (linelib)"})
+      return jsonify(self._ll_submit(self.handle(req)))
 
     START = time.time()
 
     @self.app.before_first_request
     def before_first():
-      OKAY = time.time()
-      TAKEN = OKAY - START
-      if options.get('show_logs') in [None, True]:
-        facts = [
-          "LINE API has a slow delivery.", "Congrats on your success!",
-          "I like chocolate.", "The 'New' method is deprecated.",
-          "Try out LINE Notify with linelib!",
-          "It's easy to view stats of your bot."
-        ]
-        print(
-          f"\n\n{prefix} - App Running!\n{' ' * len('linelib v2 - ')}{random.choice(facts)}\n\n✨ {colored('ready', 'blue')} in {round(TAKEN * 1000)} ms\n\n"
-        )
-
+      self._ready_log(START, options)
       self.emitEvents("ready")
 
     # launch application
@@ -244,18 +380,301 @@ class Client:
       del opt['log_level']
 
     START = time.time()  # re-assign
-    self.app.run(**opt, host="0.0.0.0", port=8080)
+
+    if options.get('server', 'flask') == 'asgi':
+      import uvicorn  # pip install uvicorn
+
+      opt.pop('server')
+      opt.pop('show_logs', None)
+      self._ll_START, self._ll_options = START, options
+      uvicorn.run(self.asgi, **opt, host="0.0.0.0", port=8080,
+                  log_level=options.get('log_level', logging.ERROR))
+      return
+
+    opt.pop('server', None)
+    self._ll_start_loop()
+
+    try:
+      self.app.run(**opt, host="0.0.0.0", port=8080)
+    finally:
+      self._ll_submit(self.close())
+      self._ll_stop_loop()
+
+  async def close(self) -> None:
+    """
+    Handles the rest of the queued events (if any), then closes the pooled connections of `Client.session`.
+    """
+    if self.queue is not None:
+      await self.queue.close()
+    await self.sweeper.close()
+    if self.outbox is not None:
+      await self.outbox.close()
+    await self.session.close()
+    if Tmp.backend is not None:
+      await asyncio.to_thread(Tmp.backend.flush)
+
+  async def push(self, to: str, messages: Any, notification_disabled: bool = False, *, retry_key: str | None = None):
+    """
+    Sends messages to a user, group or room at any time.
+
+    `to` : str
+
+    The user, group or room ID.
+
+    `messages` : Any
+
+    A message object (`TextMessage`, ..., or a `str`), or a list of them. (5 at most)
+
+    `retry_key` : str | None
+
+    A UUID that identifies this send. Retries (including yours, with the same key) are accepted by LINE once at most. A new one is made if omitted.
+    """
+    if self.outbox is not None:
+      return await self._ll_outbox('push', {"to": to, "msgs": dumpMessages(messages), "disabled": notification_disabled}, retry_key)
+    return await gate.push(self, to, dumpMessages(messages), notification_disabled, retry_key)
+
+  async def multicast(self,
+                      to: Iterable[str] | AsyncIterable[str],
+                      messages: Any,
+                      notification_disabled: bool = False,
+                      *,
+                      concurrency: int = 8,
+                      retry_key: str | None = None) -> list:
+    """
+    Sends messages to many users at once.
+
+    `to` : Iterable[str] | AsyncIterable[str]
+
+    User IDs, as many as you like. They are read lazily, split into requests of 500 recipients, and sent concurrently.
+
+    `concurrency` : int
+
+    Maximum number of requests in flight.
+
+    `retry_key` : str | None
+
+    A UUID that identifies this send. Each request gets its own key derived from it, so sending the same recipients again with the same key does not notify anyone twice.
+
+    Returns the response of each request. If any request failed, its exception is raised once every request has finished.
+    """
+    msgs = dumpMessages(messages)  # once, for every request
+    slots = asyncio.Semaphore(concurrency)
+    tasks = []
+
+    async def send(chunk: list, key: str | None):
+      if self.outbox is not None:
+        slots.release()
+        return await self._ll_outbox('multicast', {"to": chunk, "msgs": msgs, "disabled": notification_disabled}, key)
+
+      try:
+        return await gate.multicast(self, chunk, msgs, notification_disabled, key)
+      finally:
+        slots.release()
+
+    index = 0
+    async for chunk in _chunks(to, gate.MULTICAST_LIMIT):
+      await slots.acquire()  # don't read further ahead than we send
+      key = None if retry_key is None else str(uuid.uuid5(uuid.UUID(retry_key), str(index)))
+      tasks.append(asyncio.create_task(send(chunk, key)))
+      index += 1
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for res in results:
+      if isinstance(res, BaseException):
+        raise res  # the other requests are still sent
+
+    return results
+
+  async def broadcast(self, messages: Any, notification_disabled: bool = False, *, retry_key: str | None = None):
+    """
+    Sends messages to every friend of the bot. (see `push` for `retry_key`)
+    """
+    if self.outbox is not None:
+      return await self._ll_outbox('broadcast', {"msgs": dumpMessages(messages), "disabled": notification_disabled}, retry_key)
+    return await gate.broadcast(self, dumpMessages(messages), notification_disabled, retry_key)
+
+  async def _ll_outbox(self, kind: str, payload: dict, key: str | None = None) -> str:
+    """
+    Writes a send to `Client.outbox`, and makes sure it is being drained.
+    """
+    self.outbox.start(self)
+    return await self.outbox.add(kind, payload, key)
+
+  def verify(self, body: str, signature: str | None) -> bool:
+    """
+    Verifies the `X-Line-Signature` of a webhook request body.
+    """
+    if not signature:
+      return False
+
+    hash = hmac.new(self.CS.encode('utf-8'), body.encode('utf-8'),
+                    hashlib.sha256).digest()
+    return hmac.compare_digest(signature.encode("utf-8"),
+                               base64.b64encode(hash))
+
+  async def handle(self, req: dict) -> dict:
+    """
+    Handles a (verified) webhook request body, then returns the response JSON.
+
+    The events of one request are dispatched concurrently. With `ordered_sources=True`, events from the same user, group or room still run one after another, in delivery order.
+
+    With `ack='immediate'`, the events are only queued. (`Client.queue`)
+    """
+    # requested
+    self.sweeper.start()
+    if self.outbox is not None:
+      self.outbox.start(self)  # sends left from the last run
+    if self.queue is not None:
+      if self.ordered_sources:
+        sources = {}
+        for payload in req['events']:
+          sources.setdefault(getSourceKey(payload), []).append(payload)
+        for source, payloads in sources.items():
+          await self.queue.put(payloads, source)
+      else:
+        for payload in req['events']:
+          await self.queue.put([payload])
+      results = []
+    elif self.ordered_sources:
+      sources = {}
+      for payload in req['events']:
+        sources.setdefault(getSourceKey(payload), []).append(payload)
+
+      async def inOrder(payloads: list):
+        for payload in payloads:
+          await self.process(payload)
+
+      results = await asyncio.gather(*(inOrder(payloads) for payloads in sources.values()), return_exceptions=True)
+    else:
+      results = await asyncio.gather(*(self.process(payload) for payload in req['events']), return_exceptions=True)
+
+    for res in results:
+      if isinstance(res, BaseException):
+        raise res  # the other events are still handled
+
+    if req['events'] == []:  # empty array
+      cprint("\n\n🎉 Surprise!", "light_green")
+      cprint(
+        "Congratulations on your success — your webhook URL has been verified by LINE.\n\n"
+      )
+      return {"status": "Okay"}
+
+    return {"status": "OK", "message": "Request accepted (linelib)"}
+
+  async def process(self, payload: dict):
+    """
+    Builds the context of a single webhook event, then emits its handlers.
+    """
+    print(payload)
+    event_id = payload.get('webhookEventId') if self.dedupe_events else None
+    if event_id is not None:
+      # only a redelivery could have been seen; every event is remembered though
+      if payload.get('deliveryContext', {}).get('isRedelivery') and event_id in Tmp.seen_events:
+        return  # already handled
+
+      Tmp.seen_events[event_id] = True
+
+    try:
+      t = getTriggerType(payload)
+      if t in ("memberJoined", "memberLeft", "leave"):
+        self.group_cache.pop(payload['source'].get('groupId', None))
+      context: type = getContext(
+        t,
+        self,
+        payload  # duplicate
+      )  # update: NOT *getContext(...)
+      await context._ll_init()
+      self.payload_then(context)
+      await self.emit(t, context)
+    except BaseException:
+      if event_id is not None:
+        Tmp.seen_events.pop(event_id)  # not handled; let the redelivery through
+      raise
+
+  async def asgi(self, scope: dict, receive: Callable, send: Callable):
+    """
+    The ASGI application of the LINE bot. Every webhook is handled as a coroutine on the server's event loop.
+
+    Use `client.run(server='asgi')`, or serve it with any ASGI server:
+
+    ```sh
+    $ uvicorn main:client.asgi
+    ```
+    """
+    if scope['type'] == 'lifespan':
+      while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+          self._ready_log(self._ll_START, self._ll_options)
+          await self.emit("ready")
+          await send({"type": "lifespan.startup.complete"})
+        elif message['type'] == 'lifespan.shutdown':
+          await self.close()
+          await send({"type": "lifespan.shutdown.complete"})
+          return
+
+    if scope['type'] != 'http':
+      return
+
+    if scope['path'] != '/':
+      return await _asgi_respond(send, 404, b"Not Found", b"text/plain")
+
+    if scope['method'] == 'GET':
+      return await _asgi_respond(send, 200, b"LINE Bot", b"text/html; charset=utf-8")
+
+    body = b""
+    more = True
+    while more:
+      message = await receive()
+      body += message.get('body', b"")
+      more = message.get('more_body', False)
+
+    headers = dict(scope['headers'])
+    signature = headers.get(b'x-line-signature', b"").decode('utf-8')
+    text = body.decode('utf-8')
+    if not self.verify(text, signature):
+      raise Invalid(
+        "Invalid Signature",
+        f"\n\nAn invalid request was received. INFO:\nUser-Agent: {headers.get(b'user-agent', b'').decode('utf-8')}\nSignature Received: {signature}\nBody:\n{text}"
+      )
+
+    req: dict = json.loads(text)
+
+    self.request_then(req)
+    res = await self.handle(req)
+    await _asgi_respond(send, 200, json.dumps(res).encode('utf-8'), b"application/json")
+
+  def _ready_log(self, START: float, options: dict):
+    OKAY = time.time()
+    TAKEN = OKAY - START
+    if options.get('show_logs') in [None, True]:
+      facts = [
+        "LINE API has a slow delivery.", "Congrats on your success!",
+        "I like chocolate.", "The 'New' method is deprecated.",
+        "Try out LINE Notify with linelib!",
+        "It's easy to view stats of your bot."
+      ]
+      print(
+        f"\n\n{prefix} - App Running!\n{' ' * len('linelib v2 - ')}{random.choice(facts)}\n\n✨ {colored('ready', 'blue')} in {round(TAKEN * 1000)} ms\n\n"
+      )
 
   def load_cog(self, cog: type):
     if not cog._ll_CONSTRUCTED:
       raise Invalid('Invalid Command Cog', f'We found out that your cog \'{cog.__name__}\' was not constrcted.\nPlease use `client.load_cog({cog.__name__}())` instead.')
 
-    @self.event('text')
-    async def on_mount(ctx):
-        res = await cog.emit(ctx)
-        if res == 'all-nf' and cog.show_not_found_log:
-            print('\n' + colored('linelib v2', 'light_green') + " " + colored('COG', attrs=['bold', 'underline']) + f" - {cog.name}\n{' ' * len('linelib v2 ')}" + colored(f'Command \'{ctx.content.strip().split(" ")[0]}\' not found.', 'red') + '\n')
+    if self.router is None:
+      # one text listener for every cog
+      self.router = CommandRouter()
 
+      @self.event('text')
+      async def on_mount(ctx):
+          res = await self.router.emit(ctx)
+          if res == 'all-nf':
+              for cog in self.router.cogs:
+                  if cog.show_not_found_log:
+                      print('\n' + colored('linelib v2', 'light_green') + " " + colored('COG', attrs=['bold', 'underline']) + f" - {cog.name}\n{' ' * len('linelib v2 ')}" + colored(f'Command \'{ctx.content.strip().split(" ")[0]}\' not found.', 'red') + '\n')
+
+    self.router.add_cog(cog)
     return ...
 
   load_extension = load_cog
@@ -269,4 +688,32 @@ class Client:
     await asyncio.sleep(seconds)
 
 
+async def _chunks(items: Iterable | AsyncIterable, size: int):
+  chunk = []
+  if hasattr(items, '__aiter__'):
+    async for item in items:
+      chunk.append(item)
+      if len(chunk) == size:
+        yield chunk
+        chunk = []
+  else:
+    for item in items:
+      chunk.append(item)
+      if len(chunk) == size:
+        yield chunk
+        chunk = []
+
+  if chunk:
+    yield chunk
+
+
+async def _asgi_respond(send: Callable, status: int, body: bytes, content_type: bytes):
+  await send({
+    "type": "http.response.start",
+    "status": status,
+    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+  })
+  await send({"type": "http.response.body", "body": body})
+
+
 # hello if ur on github
\ No newline at end of file
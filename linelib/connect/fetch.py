@@ -3,88 +3,142 @@ fetch fetch fetch fetch
 """
 
 from __future__ import annotations
-import httpx # pip install httpx
+import asyncio
 import termcolor
 import uuid
 import os
 from tqdm import tqdm
 from mimetypes import guess_extension
 
+from ..cache import TTLCache
 from ..exceptions import ClientException
+from ..exceptions import Usage as UsageError
+from .session import Session
 
 
 def fetch_this(thing: str):
   return "https://api.line.me/v2/bot/" + thing.replace('.', '/')
 
-async def profile(headers: dict, user_id: str) -> type:
-  async with httpx.AsyncClient() as session:
-    res = await session.get(fetch_this(f'profile.{user_id}'), headers=headers) # response
-    json = res.json() # the response json
-      
-    class Profile:
-      name = display_name = json['displayName']
-      id = user_id = json['userId']
-      language = region = json['language']
-      picture_url = picture = avatar_url = avatar = json['pictureUrl']
-      status_message = status = json['statusMessage']
-      
-    return Profile() # without brackets...? well, it works too.
-
-async def profileAndGroup(headers: dict, user_id: str, group_id: str) -> type:
-    async with httpx.AsyncClient() as session:
-        res = await session.get(fetch_this(f'profile.{user_id}'), headers=headers) # response
-        json = res.json() # the response json
-        
-        class Profile:
-          name = display_name = json['displayName']
-          id = user_id = json['userId']
-          language = region = json['language']
-          picture_url = picture = avatar_url = avatar = json['pictureUrl']
-          status_message = status = json['statusMessage']
-
-        async def get_group():
-            async with httpx.AsyncClient() as session:
-                GS_RES = await session.get(fetch_this(f'group.{group_id}.summary'), headers=headers)
-                groupSum = GS_RES.json()
-
-                MC_RES = await session.get(fetch_this(f'group.{group_id}.members.count'), headers=headers)
-                groupMemberCount = MC_RES.json()['count']
-        
-                
-                class Group:
-                    count: int = groupMemberCount
-                    id: str = groupSum['groupId']
-                    name: str = groupSum['groupName']
-                    picture_url = picture = groupSum['pictureUrl']
+async def profile(session: Session, user_id: str, cache: TTLCache | None = None) -> type:
+  if cache is not None:
+    cached = cache.get(user_id)
+    if cached is not None:
+      return cached
+
+  res = await session.request('profile', 'GET', fetch_this(f'profile.{user_id}')) # response
+  json = res.json() # the response json
+
+  class Profile:
+    name = display_name = json['displayName']
+    id = user_id = json['userId']
+    language = region = json['language']
+    picture_url = picture = avatar_url = avatar = json['pictureUrl']
+    status_message = status = json['statusMessage']
+
+  result = Profile() # without brackets...? well, it works too.
+  if cache is not None:
+    cache[user_id] = result
+
+  return result
+
+async def group(session: Session, group_id: str, cache: TTLCache | None = None) -> type:
+    if cache is not None:
+        cached = cache.get(group_id)
+        if cached is not None:
+            return cached
+
+    GS_RES, MC_RES = await asyncio.gather(
+        session.request('profile', 'GET', fetch_this(f'group.{group_id}.summary')),
+        session.request('profile', 'GET', fetch_this(f'group.{group_id}.members.count'))
+    )
+    groupSum = GS_RES.json()
+    groupMemberCount = MC_RES.json()['count']
+
+
+    class Group:
+        count: int = groupMemberCount
+        id: str = groupSum['groupId']
+        name: str = groupSum['groupName']
+        picture_url = picture = groupSum['pictureUrl']
+
+        async def leave(self):
+            return await leave_gr(session, group_id)
+
+    result = Group()
+    if cache is not None:
+        cache[group_id] = result
+
+    return result
+
+async def profileAndGroup(session: Session, user_id: str, group_id: str, cache: TTLCache | None = None, group_cache: TTLCache | None = None) -> type:
+    _profile = await profile(session, user_id, cache)
+
+    async def get_group():
+        return await group(session, group_id, group_cache)
+
+    return (_profile, get_group)
+
+class LazyProfile:
+  """
+  A user profile that is only fetched on first use.
+
+  The user ID is available right away (`id`, `user_id`). For the rest of the profile, use `await ctx.author` once (or `Client(eager_author=True)`); after that, the attributes can be accessed as usual. Before that, they always raise `Usage`, even if the profile happens to be cached.
+
+  ```py
+  author = await ctx.author
+  print(author.name)
+  ```
+  """
+
+  def __init__(self, session: Session, user_id: str, cache: TTLCache | None = None):
+    self.id = self.user_id = user_id
+    self._ll_session = session
+    self._ll_cache = cache
+    self._ll_profile = None
+
+  async def fetch(self) -> type:
+    """
+    Fetches the profile. (Only once.)
+    """
+    if self._ll_profile is None:
+      self._ll_profile = await profile(self._ll_session, self.id, self._ll_cache)
+    return self._ll_profile
+
+  def __await__(self):
+    return self.fetch().__await__()
 
-                    async def leave(self):
-                        return await leave_gr(headers, group_id)
+  def __getattr__(self, name: str):
+    if name.startswith('_'):
+      raise AttributeError(name)
 
-                return Group()
+    if self._ll_profile is None:
+      raise UsageError(
+        "Usage Error", f"The profile of '{self.id}' has not been fetched yet. Use `await ctx.author` before accessing `ctx.author.{name}`, or `Client(eager_author=True)`."
+      )
+    return getattr(self._ll_profile, name)
 
-        return (Profile(), get_group)
+  def __repr__(self):
+    return f"<LazyProfile id='{self.id}' fetched={self._ll_profile is not None}>"
 
-async def leave_gr(headers: dict, group_id: str):
+async def leave_gr(session: Session, group_id: str):
     """
     Leave a `gr`oup chat.
     """
     try:
-        async with httpx.AsyncClient() as session:
-            res = await session.post(fetch_this(f'group.{group_id}.leave'), headers=headers)
-            return res
+        res = await session.request('profile', 'POST', fetch_this(f'group.{group_id}.leave'))
+        return res
     except Exception as err:
         raise ClientException(err)
 
 
-async def getContent(headers: dict, message_id: str):
+async def getContent(session: Session, message_id: str):
     """
     Fetches the message content. (images, videos, audio, and files)
     """
     fileName = "linelib-dl-" + str(uuid.uuid4()).split('-')[0] + ".TMP"
     try:
-        client = httpx.AsyncClient()
         with open(fileName, 'wb') as file: # FILE !important
-            async with client.stream('GET', f"https://api-data.line.me/v2/bot/message/{message_id}/content", headers=headers) as response:
+            async with session.stream('content', 'GET', f"https://api-data.line.me/v2/bot/message/{message_id}/content") as response:
                 print("\n\n" + termcolor.colored('linelib v2', 'light_green') + "- 📦 Downloading files...")
                 
                 fileExtension = guess_extension(response.headers['content-type'].partition(';')[0].strip())
@@ -2,26 +2,75 @@
 
 from __future__ import annotations
 
-from ..exceptions import ClientException
+import uuid
 
 import httpx # pip install httpx
 
+from ..exceptions import ClientException
+
+# const
+MULTICAST_LIMIT = 500 # recipients per request, limited by LINE
+
 def url(r: str):
   return "https://api.line.me/v2/" + r.replace('.', '/')
 
+async def send(client: type, kind: str, endpoint: str, json: dict, retry_key: str | None = None) -> httpx.Response:
+  """
+  Posts `json` within the rate limits of `kind` (retrying 429s and 5xxs), then raises if LINE still refused it.
+
+  With a `retry_key`, every retry of this send carries the same `X-Line-Retry-Key`, so LINE accepts it once at most; timeouts are retried too, and a 409 (already accepted) is a success.
+  """
+  try:
+    if retry_key is None:
+      r = await client.session.request(kind, 'POST', endpoint, json=json)
+    else:
+      r = await client.session.request(kind, 'POST', endpoint, json=json, headers={"X-Line-Retry-Key": retry_key}, idempotent=True)
+  except Exception as err:
+    raise ClientException(err)
+
+  if r.status_code == 409 and retry_key is not None:
+    return r # accepted by an earlier try
+
+  if r.is_error:
+    err = ClientException(f"{r.status_code} {r.reason_phrase} ({endpoint}): {r.text}")
+    err.response = r
+    raise err
+  return r
+
 async def reply(client: type, rt: str, msgs: list, disabled: bool):
   """
   rt: reply token
   """
-  try:
-    async with httpx.AsyncClient() as session:
-      r = await session.post(url('bot.message.reply'), headers=client.headers, json={
-        "replyToken": rt,
-        "messages": msgs,
-        "notificationDisabled": disabled
-      })
-      print(r)
-      return r
-  except Exception as err:
-    raise ClientException(err)
+  return await send(client, 'reply', url('bot.message.reply'), {
+    "replyToken": rt,
+    "messages": msgs,
+    "notificationDisabled": disabled
+  })
+
+async def push(client: type, to: str, msgs: list, disabled: bool, retry_key: str | None = None):
+  """
+  to: user, group or room ID
+  retry_key: a UUID, new for each push by default
+  """
+  return await send(client, 'push', url('bot.message.push'), {
+    "to": to,
+    "messages": msgs,
+    "notificationDisabled": disabled
+  }, retry_key or str(uuid.uuid4()))
+
+async def multicast(client: type, to: list, msgs: list, disabled: bool, retry_key: str | None = None):
+  """
+  to: user IDs (`MULTICAST_LIMIT` at most)
+  retry_key: a UUID, new for each multicast by default
+  """
+  return await send(client, 'multicast', url('bot.message.multicast'), {
+    "to": to,
+    "messages": msgs,
+    "notificationDisabled": disabled
+  }, retry_key or str(uuid.uuid4()))
 
+async def broadcast(client: type, msgs: list, disabled: bool, retry_key: str | None = None):
+  return await send(client, 'broadcast', url('bot.message.broadcast'), {
+    "messages": msgs,
+    "notificationDisabled": disabled
+  }, retry_key or str(uuid.uuid4()))
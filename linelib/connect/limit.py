@@ -0,0 +1,216 @@
+"""
+Rate limits & retries of outbound LINE API calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx # pip install httpx
+
+# const
+# endpoint class => (requests per second, burst), see https://developers.line.biz/en/reference/messaging-api/#rate-limits
+RATE_LIMITS = {
+  "reply": (2000.0, 2000),
+  "push": (2000.0, 2000),
+  "multicast": (200.0, 200),
+  "broadcast": (60 / 3600, 60),
+  "profile": (2000.0, 2000), # profiles, groups, and other bot calls
+  "content": (2000.0, 2000)
+}
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+  """
+  Allows `rate` requests per second on average, and bursts of up to `burst` requests.
+
+  `rate` : float
+
+  Requests per second.
+
+  `burst` : int
+
+  Maximum number of requests sent at once.
+  """
+
+  def __init__(self, rate: float, burst: int):
+    self.rate = rate
+    self.burst = burst
+    self.tokens: float = burst
+    self.updated: float = time.monotonic()
+    self.paused_until: float = 0.0
+    self._lock: asyncio.Lock | None = None
+
+  async def acquire(self) -> None:
+    """
+    Waits for a token. Waiters are served in order.
+    """
+    if self._lock is None:
+      self._lock = asyncio.Lock()
+
+    async with self._lock:
+      while True:
+        now = time.monotonic()
+        if now < self.paused_until:
+          await asyncio.sleep(self.paused_until - now)
+          continue
+
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+          self.tokens -= 1
+          return
+
+        await asyncio.sleep((1 - self.tokens) / self.rate)
+
+  def pause(self, seconds: float) -> None:
+    """
+    Holds every request for `seconds`. (e.g., after a 429)
+    """
+    self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+    self.tokens = 0
+    self.updated = self.paused_until # no refill while paused, so the pause isn't followed by a full burst
+
+
+class Limiter:
+  """
+  A token bucket per endpoint class, shared by every outbound call of a `Client`. Requests rejected with 429 or 5xx are retried after a delay: the `Retry-After` header if LINE sent one, or a jittered exponential backoff.
+
+  `limits` : dict[str, tuple[float, int]]
+
+  Overrides `RATE_LIMITS`, e.g., `{"push": (500, 500)}`.
+
+  `retries` : int
+
+  Maximum retries of a single request.
+
+  `backoff` : float
+
+  Seconds before the first retry; doubled after each retry, up to `max_backoff`.
+  """
+
+  def __init__(self,
+               limits: dict[str, tuple[float, int]] | None = None,
+               *,
+               retries: int = 5,
+               backoff: float = 0.5,
+               max_backoff: float = 30.0):
+    self.buckets = {kind: TokenBucket(*limit) for kind, limit in {**RATE_LIMITS, **(limits or {})}.items()}
+    self.retries = retries
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+
+    self.retried: int = 0
+    self.throttled: int = 0 # 429s
+
+  async def acquire(self, kind: str) -> None:
+    await self.buckets[kind].acquire()
+
+  def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+    """
+    Seconds to wait before retry number `attempt + 1`.
+    """
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+      try:
+        return max(0.0, float(retry_after))
+      except ValueError:
+        try:
+          return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+          pass
+
+    delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2) # so that retries don't line up
+
+  async def request(self,
+                    client: httpx.AsyncClient,
+                    kind: str,
+                    method: str,
+                    url: str,
+                    *,
+                    idempotent: bool = False,
+                    **kwargs) -> httpx.Response:
+    """
+    Sends a request within the limits of `kind`, retrying 429s and 5xxs. Returns the last response.
+
+    `idempotent` - Whether the request is safe to send twice (e.g., it has an `X-Line-Retry-Key`), so that timeouts and connection errors are retried too.
+    """
+    attempt = 0
+    while True:
+      await self.acquire(kind)
+      try:
+        response = await client.request(method, url, **kwargs)
+      except httpx.TransportError:
+        # we can't tell whether LINE got it
+        if not idempotent or attempt >= self.retries:
+          raise
+
+        await self._backoff(kind, attempt)
+        attempt += 1
+        continue
+
+      if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+        return response
+
+      await self._backoff(kind, attempt, response)
+      attempt += 1
+
+  @contextlib.asynccontextmanager
+  async def stream(self, client: httpx.AsyncClient, kind: str, method: str, url: str, **kwargs):
+    """
+    Same as `request`, but the body of the last response is streamed. (e.g., message content) The request must be safe to send twice, so timeouts and connection errors are retried too.
+
+    ```py
+    async with limiter.stream(client, 'content', 'GET', url) as response:
+      async for chunk in response.aiter_bytes():
+        ...
+    ```
+    """
+    attempt = 0
+    while True:
+      await self.acquire(kind)
+      try:
+        response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+      except httpx.TransportError:
+        if attempt >= self.retries:
+          raise
+
+        await self._backoff(kind, attempt)
+        attempt += 1
+        continue
+
+      if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+        break
+
+      await response.aclose()
+      await self._backoff(kind, attempt, response)
+      attempt += 1
+
+    try:
+      yield response
+    finally:
+      await response.aclose()
+
+  async def _backoff(self, kind: str, attempt: int, response: httpx.Response | None = None) -> None:
+    delay = self.delay(attempt, response)
+    self.retried += 1
+    if response is not None and response.status_code == 429:
+      # the whole endpoint class is over its quota, not only this request
+      self.throttled += 1
+      self.buckets[kind].pause(delay)
+    else:
+      await asyncio.sleep(delay)
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "retried": self.retried,
+      "throttled": self.throttled,
+      "tokens": {kind: bucket.tokens for kind, bucket in self.buckets.items()}
+    }
@@ -0,0 +1,96 @@
+"""
+Keep-alive sessions. (connection pools)
+"""
+
+from __future__ import annotations
+
+import httpx # pip install httpx
+
+from .limit import Limiter
+
+
+class Session:
+  """
+  A keep-alive connection pool, shared by every outbound LINE API call of a `Client`.
+
+  The underlying `httpx.AsyncClient` is created on first use, so that it belongs to the event loop that actually sends the requests.
+
+  `headers` : dict
+
+  Default headers of every request. (e.g., `Authorization`)
+
+  `max_connections` : int
+
+  Maximum number of concurrent connections.
+
+  `max_keepalive_connections` : int
+
+  Maximum number of idle connections kept alive for later requests.
+
+  `keepalive_expiry` : float
+
+  Seconds an idle connection is kept alive.
+
+  `timeout` : float
+
+  Request timeout, in seconds.
+
+  `limiter` : Limiter
+
+  Rate limits & retries of `request`. (default: `Limiter()`)
+  """
+
+  def __init__(self,
+               headers: dict,
+               *,
+               max_connections: int = 100,
+               max_keepalive_connections: int = 20,
+               keepalive_expiry: float = 30.0,
+               timeout: float = 10.0,
+               limiter: Limiter | None = None):
+    self.headers = headers
+    self.limiter = limiter or Limiter()
+    self.limits = httpx.Limits(
+      max_connections=max_connections,
+      max_keepalive_connections=max_keepalive_connections,
+      keepalive_expiry=keepalive_expiry
+    )
+    self.timeout = httpx.Timeout(timeout)
+    self._client: httpx.AsyncClient | None = None
+
+  @property
+  def client(self) -> httpx.AsyncClient:
+    """
+    The pooled `httpx.AsyncClient`.
+    """
+    if self._client is None or self._client.is_closed:
+      self._client = httpx.AsyncClient(
+        headers=self.headers,
+        limits=self.limits,
+        timeout=self.timeout
+      )
+    return self._client
+
+  async def request(self, kind: str, method: str, url: str, *, idempotent: bool = False, **kwargs) -> httpx.Response:
+    """
+    Sends a request within the rate limits of the endpoint class `kind`. (see `Limiter`)
+    """
+    return await self.limiter.request(self.client, kind, method, url, idempotent=idempotent, **kwargs)
+
+  def stream(self, kind: str, method: str, url: str, **kwargs):
+    """
+    Streams the response of a request within the rate limits of `kind`. (see `Limiter.stream`)
+    """
+    return self.limiter.stream(self.client, kind, method, url, **kwargs)
+
+  @property
+  def closed(self) -> bool:
+    return self._client is None or self._client.is_closed
+
+  async def close(self) -> None:
+    """
+    Closes every pooled connection.
+    """
+    if self._client is not None:
+      await self._client.aclose()
+      self._client = None
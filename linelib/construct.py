@@ -42,6 +42,11 @@ def getTriggerType(req: dict):
     return req['type']
 
 
+def getSourceKey(req: dict) -> str | None:
+  source = req.get('source', {})
+  return source.get('groupId') or source.get('roomId') or source.get('userId')
+
+
 def getContext(_type: str, client, req) -> type:
   context = ({
       "text": TextMessageEvent,
@@ -68,7 +73,7 @@ def getContext(_type: str, client, req) -> type:
   ))
   context.stored = context.memory = Tmp.handle_action[_type]
   if _type == 'postback':
-    context.action_stored = Tmp.action_storage[context.data]
+    context.action_stored = Tmp.action_storage.get(context.data, {})
 
   return context
 
@@ -0,0 +1,131 @@
+"""
+Background event processing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from termcolor import colored
+
+# const
+prefix = colored('linelib v2', 'light_green')
+
+
+class EventQueue:
+  """
+  An in-process queue of webhook events, drained by a pool of worker tasks.
+
+  Used by `Client(ack='immediate')`: the webhook is acknowledged as soon as its events are queued, and the workers handle them in the background.
+
+  `client` : Client
+
+  The client that handles the events. (`Client.process`)
+
+  `workers` : int
+
+  Number of worker tasks.
+
+  `maxsize` : int
+
+  Maximum number of queued items. (per worker, if `ordered`) `0` for no limit. When the queue is full, new webhooks wait for a free slot before they are acknowledged.
+
+  `ordered` : bool
+
+  Gives each worker its own queue, and always queues the events of one source (see `put`) to the same worker, so they are handled in delivery order across webhooks too. (`Client(ordered_sources=True)`)
+  """
+
+  def __init__(self, client: Any, workers: int = 4, maxsize: int = 0, ordered: bool = False):
+    self.client = client
+    self.workers = workers
+    self.maxsize = maxsize
+    self.ordered = ordered
+
+    self.enqueued: int = 0
+    self.processed: int = 0
+    self.failed: int = 0
+    self.wait_count: int = 0
+    self.wait_total: float = 0.0
+    self.wait_max: float = 0.0
+
+    self._queues: list[asyncio.Queue] = []
+    self._tasks: list[asyncio.Task] = []
+
+  def start(self) -> None:
+    """
+    Starts the workers on the running event loop. (Only once.)
+    """
+    if self._tasks:
+      return
+
+    # shared by every worker, unless ordered
+    self._queues = [asyncio.Queue(self.maxsize) for _ in range(self.workers if self.ordered else 1)]
+    self._tasks = [asyncio.create_task(self._worker(self._queues[i % len(self._queues)])) for i in range(self.workers)]
+
+  async def put(self, payloads: list, key: Any = None) -> None:
+    """
+    Queues events which are handled one after another, in order.
+
+    `key` - The source of the events. (`getSourceKey`) With `ordered`, events with the same key go to the same worker.
+    """
+    self.start()
+    queue = self._queues[hash(key) % len(self._queues)]
+    await queue.put((time.monotonic(), payloads))
+    self.enqueued += len(payloads)
+
+  async def _worker(self, queue: asyncio.Queue):
+    while True:
+      queued, payloads = await queue.get()
+      waited = time.monotonic() - queued
+      self.wait_count += 1
+      self.wait_total += waited
+      self.wait_max = max(self.wait_max, waited)
+
+      try:
+        for payload in payloads:
+          try:
+            await self.client.process(payload)
+            self.processed += 1
+          except Exception as err:
+            self.failed += 1
+            print(f"\n\n{prefix} - {colored('Exception ~ EVENT_QUEUE', 'red')}:\n{err!r}\n\n")
+      finally:
+        queue.task_done()
+
+  async def join(self) -> None:
+    """
+    Waits until every queued event has been handled.
+    """
+    for queue in self._queues:
+      await queue.join()
+
+  async def close(self) -> None:
+    """
+    Handles the rest of the queued events, then stops the workers.
+    """
+    await self.join()
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._tasks = []
+
+  @property
+  def depth(self) -> int:
+    """
+    Number of queued items that are waiting for a worker.
+    """
+    return sum(queue.qsize() for queue in self._queues)
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "depth": self.depth,
+      "workers": len(self._tasks),
+      "enqueued": self.enqueued,
+      "processed": self.processed,
+      "failed": self.failed,
+      "wait_avg": (self.wait_total / self.wait_count) if self.wait_count else 0.0,
+      "wait_max": self.wait_max
+    }
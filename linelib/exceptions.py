@@ -33,4 +33,13 @@ class MissingArgument(Exception):
     """
     Represents a command argument was not passed into.
     """
-    pass
\ No newline at end of file
+    pass
+
+class BadArgument(Exception):
+    """
+    Represents a command argument could not be converted to its annotated type.
+    """
+    def __init__(self, name: str, argument: str, err: Exception):
+        self.name = name
+        self.argument = argument
+        super().__init__(f"Argument '{name}' could not be converted: {err}")
\ No newline at end of file
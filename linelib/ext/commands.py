@@ -3,7 +3,7 @@ from __future__ import annotations
 import inspect
 from typing import Callable
 
-from ..exceptions import MissingArgument, Async
+from ..exceptions import MissingArgument, BadArgument, Async
 from .rule import CommandRule, DEFAULT_RULE, _dfr
 
 class _str:
@@ -27,36 +27,113 @@ class Cog:
         cls._ll_CONSTRUCTED: bool = False
         [cls._ll_commands.append(getattr(cls, i)) if (not i.startswith('__')) and (isinstance(getattr(cls, i), CogCommandWrapper)) else None for i in dir(cls)]
 
+        # name => commands (one hash lookup per message)
+        cls._ll_index: dict = {}
+        for cmd in cls._ll_commands:
+            cls._ll_index.setdefault(cmd.name, []).append(cmd)
+
     async def emit(self, ctx: type):
-        gathered = []
-        
-        for cmd in self._ll_commands:
-            res = await cmd.emit(self, ctx)
-            gathered.append(res)
-
-        if all(i == 'no' for i in gathered):
-            await self.not_found(ctx, ctx.content.strip().split(' ')[0])
+        name, _, text = ctx.content.strip().partition(' ')
+        commands = self._ll_index.get(name, None)
+
+        if not commands:
+            await self.not_found(ctx, name)
             return 'all-nf' # all not found
 
+        for cmd in commands:
+            await cmd.invoke(self, ctx, text)
+
     async def not_found(self, ctx, command: str):
         """
         Do something when a command was not found.
         """
         pass # default
 
+class CommandRouter:
+    """
+    Routes text messages to the commands of every loaded cog.
+
+    The command is resolved once, with a single lookup across all cogs; then only the owning cog is called. `not_found` is only fired when no cog has the command.
+    """
+    def __init__(self):
+        self.cogs: list = []
+        self._ll_index: dict = {} # name => [(cog, command), ...]
+
+    def add_cog(self, cog: Cog) -> None:
+        self.cogs.append(cog)
+        for name, commands in cog._ll_index.items():
+            for cmd in commands:
+                self._ll_index.setdefault(name, []).append((cog, cmd))
+
+    async def emit(self, ctx: type):
+        name, _, text = ctx.content.strip().partition(' ')
+        found = self._ll_index.get(name, None)
+
+        if not found:
+            for cog in self.cogs:
+                await cog.not_found(ctx, name)
+            return 'all-nf' # all not found
+
+        for cog, cmd in found:
+            await cmd.invoke(cog, ctx, text)
+
+def _to_bool(arg: str) -> bool:
+    lowered = arg.lower()
+    if lowered in ('true', 'yes', 'y', 'on', '1'):
+        return True
+    if lowered in ('false', 'no', 'n', 'off', '0'):
+        return False
+    raise ValueError(f"'{arg}' is not a boolean.")
+
+CONVERTERS = {
+    int: int,
+    float: float,
+    bool: _to_bool,
+    str: None # no conversion needed
+}
+
+_PARSER = """
+def parseSimple(text):
+    if '"' in text or "'" in text:
+        return parse(text)
+
+    parts = text.split(None, {count})
+    if len(parts) < {count}:
+        return parse(text)
+
+    try:
+        args = [{args}]
+    except ValueError:
+        return parse(text) # raises `BadArgument`
+    return args, {rest}
+"""
+
 class CogCommandWrapper:
     """
     Represents a cog command.
+
+    The command signature is compiled once into a parser:
+
+    - Arguments are separated by spaces. Quote an argument (`"..."` or `'...'`) to include spaces.
+    - Parameters with default values are optional.
+    - A keyword-only parameter (after `*`) takes the rest of the message, as-is.
+    - `bool` arguments accept `true`/`false`, `yes`/`no`, `on`/`off`, `y`/`n` and `1`/`0`. (Before, any non-empty text was `True`: `no` is now `False`, and `maybe` raises `BadArgument`.)
     """
     def __init__(self, cmd_name: str, func, rule: CommandRule | _dfr = DEFAULT_RULE):
         parameters = inspect.signature(func).parameters
 
-        self.ann = []
-        self.rule = rule.emit
+        # only rules with a custom handler may have to be awaited (see `CommandRule.aemit`)
+        self._ll_awaits_rule: bool = rule.needs_await
+        self.rule = rule.aemit if self._ll_awaits_rule else rule.emit
 
         keywordOnlyAlreadyFound = False
         cur = 0 # current state
 
+        # compiled
+        positional = [] # (name, converter, required)
+        self._ll_variadic: tuple | None = None # (name, converter) of *args
+        self._ll_rest: str | None = None # the keyword-only parameter
+
         for name, param in parameters.items():
             cur += 1
             if cur < 3: # meaning that (1, 2) will both be ignored
@@ -71,50 +148,145 @@ class CogCommandWrapper:
                 else:
                     keywordOnlyAlreadyFound = True
                     # str(name) == parameter name.
-                    self.ann.append(('*', str(name)))
+                    self._ll_rest = str(name)
             else:
                 ann = param.annotation if (not param.annotation is inspect._empty is inspect._empty) else str # empty annotation? then str.
 
-                self.ann.append((ann,))
+                if param.kind == inspect.Parameter.VAR_POSITIONAL:
+                    self._ll_variadic = (name, CONVERTERS[ann])
+                else:
+                    positional.append((name, CONVERTERS[ann], param.default is inspect._empty))
 
+        self._ll_positional: tuple = tuple(positional)
+        self._ll_converters: tuple = tuple((name, convert) for name, convert, _ in positional)
+        self._ll_required: int = sum(required for *_, required in positional)
+        self._ll_parse = self._ll_compile()
         self.func: type = func
         self.name = cmd_name
-    
+
+    def _ll_compile(self) -> Callable[[str], tuple[list, dict]]:
+        """
+        Generates the parser of this signature. When every parameter is required and there is no `*args`, unquoted input is parsed by a single `split` with the conversions unrolled; anything else (quotes, missing or bad arguments) goes through `parse`.
+        """
+        if self._ll_variadic or self._ll_required < len(self._ll_positional):
+            return self.parse
+
+        count = self._ll_required
+        namespace = {"parse": self.parse}
+        args = []
+        for index, (_, convert) in enumerate(self._ll_converters):
+            if convert is None:
+                args.append(f"parts[{index}]")
+            else:
+                namespace[f"convert{index}"] = convert
+                args.append(f"convert{index}(parts[{index}])")
+
+        rest = f"{{{self._ll_rest!r}: parts[{count}].rstrip()}} if len(parts) > {count} else {{}}" if self._ll_rest else "{}"
+        exec(_PARSER.format(count=count, args=", ".join(args), rest=rest), namespace)
+        return namespace["parseSimple"]
+
+    def parse(self, text: str) -> tuple[list, dict]:
+        """
+        Parses the message content after the command name into `(args, kwargs)`.
+
+        Raises `MissingArgument` or `BadArgument`.
+        """
+        tokens, rest = self._ll_split(text)
+
+        if len(tokens) < self._ll_required:
+            raise MissingArgument(f"missing a required argument: '{self._ll_positional[len(tokens)][0]}'")
+
+        args = []
+        for (name, convert), arg in zip(self._ll_converters, tokens):
+            if convert is not None:
+                try:
+                    arg = convert(arg)
+                except ValueError as err:
+                    raise BadArgument(name, arg, err) from None
+            args.append(arg)
+
+        if self._ll_variadic and len(tokens) > len(args):
+            name, convert = self._ll_variadic
+            for arg in tokens[len(args):]:
+                if convert is not None:
+                    try:
+                        arg = convert(arg)
+                    except ValueError as err:
+                        raise BadArgument(name, arg, err) from None
+                args.append(arg)
+
+        if rest and self._ll_rest:
+            return args, {self._ll_rest: rest}
+        return args, {}
+
+    def _ll_split(self, text: str) -> tuple[list, str]:
+        count = len(self._ll_positional)
+
+        if not ('"' in text or "'" in text): # fast path
+            if self._ll_variadic:
+                return text.split(), ''
+
+            parts = text.split(None, count)
+            if len(parts) > count:
+                return parts[:count], parts[count].strip()
+            return parts, ''
+
+        tokens = []
+        pos = 0
+        length = len(text)
+        while len(tokens) < count or self._ll_variadic:
+            while pos < length and text[pos].isspace():
+                pos += 1
+            if pos >= length:
+                break
+
+            if text[pos] in ('"', "'"):
+                end = text.find(text[pos], pos + 1)
+                if end == -1: # unclosed quote: the rest
+                    end = length
+                tokens.append(text[pos + 1:end])
+                pos = end + 1
+            else:
+                end = pos
+                while end < length and not text[end].isspace():
+                    end += 1
+                tokens.append(text[pos:end])
+                pos = end
+
+        return tokens, text[pos:].strip()
+
     async def emit(self, o: Cog, ctx: type):
         """Emits the command."""
 
-        msg = ctx.content.strip()
+        name, _, text = ctx.content.strip().partition(' ')
 
-        splitted = msg.split(' ')
-        
-        args = splitted[1:]
-
-        if splitted[0] == self.name:
-            should = self.rule(ctx)
-            if not should: # not allowed
-                await self._RULE_REJECT(o, ctx)
-                return
-            _PASS = [] # arguments that will be passed in. (*)
-            _NAMED = {} # named arguments. (**)
-
-            for i in range(len(args)):
-                if (i + 1) > len(self.ann):
-                    break # end this
-                if self.ann[i][0] != '*':
-                    try:
-                        _PASS.append(self.ann[i][0](args[i])) # annotations (type)
-                    except Exception as err:
-                        await self._LL_ERR(o, ctx, err)
-                else: # *
-                    _NAMED[self.ann[i][1]] = ' '.join(args[i:])
-            try:
-              await self.func(o, ctx, *_PASS, **_NAMED)
-            except Exception as err:
-                ERROR = MissingArgument(str(err)) if (isinstance(err, TypeError) and "missing" in str(err)) else err
-                await self._LL_ERR(o, ctx, ERROR)
+        if name == self.name:
+            return await self.invoke(o, ctx, text)
 
         return 'no'
 
+    async def invoke(self, o: Cog, ctx: type, text: str):
+        """Invokes the command with the message content after the command name."""
+        if self._ll_awaits_rule:
+            should = await self.rule(ctx, self)
+        else:
+            should = self.rule(ctx, self)
+        if not should: # not allowed
+            await self._RULE_REJECT(o, ctx)
+            return
+
+        try:
+            _PASS, _NAMED = self._ll_parse(text)
+        except (MissingArgument, BadArgument) as err:
+            await self._LL_ERR(o, ctx, err)
+            return
+
+        try:
+          await self.func(o, ctx, *_PASS, **_NAMED)
+        except Exception as err:
+            ERROR = MissingArgument(str(err)) if (isinstance(err, TypeError) and "missing" in str(err)) else err
+            await self._LL_ERR(o, ctx, ERROR)
+
     def on_error(self, function: Callable) -> Callable:
         if not inspect.iscoroutinefunction(function):
             raise Async("Async Function", f"The function '{function.__name__}' should be an async (coroutine) function. Example:\n\nasync def my_function(...)\n\n")
@@ -129,7 +301,7 @@ class CogCommandWrapper:
         self._RULE_REJECT = function
         return function
 
-    async def _RULE_REJECT(self, ctx):
+    async def _RULE_REJECT(self, o, ctx):
         pass # default
 
     
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Iterator
 from typing import Literal
+import inspect
+import itertools
+import os
 import time
 
+from ..cache import TTLCache
+from ..exceptions import Usage as UsageError
 from ..tmp import Tmp
 
 # const
@@ -12,24 +19,100 @@ VALID_RULES = {
     "except": ('users',), 
     "for": ('users',),
     "based.custom": (),
-    "usage_limit": ('times',)
+    "usage_limit": ('times',),
+    "rate_limit": ('times', 'seconds')
 }
 
+RATE_LIMIT_SCOPES = ('user', 'group', 'global')
+
+RULE_COSTS = {
+    # cheap (set membership) => stateful
+    "except": 0,
+    "for": 0,
+    "based.custom": 1,
+    "cooldown": 2,
+    "usage_limit": 2,
+    "rate_limit": 2
+}
+
+_RULE_IDS = itertools.count() # default rule names, see `CommandRule.name`
+
+class _Composable:
+    """
+    Rules that can be combined with `&` (and), `|` (or) and `~` (not).
+    """
+    def emit(self, ctx, command=None) -> bool:
+        """
+        Checks the rule. If it passes, its state (cooldown, usage, ...) is updated.
+
+        For rules with an async custom handler, use `await rule.aemit(ctx)` instead.
+        """
+        return self._apply(self._plan(ctx, command), ctx, command)
+
+    async def aemit(self, ctx, command=None) -> bool:
+        """
+        Same as `emit`, but async custom handlers are awaited. (used by cog commands)
+        """
+        return self._apply(await self._aplan(ctx, command), ctx, command)
+
+    def check(self, ctx, command=None) -> bool:
+        """
+        Whether the rule passes. This does not change any state.
+        """
+        return self._plan(ctx, command) is not None
+
+    async def acheck(self, ctx, command=None) -> bool:
+        return await self._aplan(ctx, command) is not None
+
+    def _plan(self, ctx, command=None) -> list | None:
+        """
+        Evaluates the rule once. Returns the rules whose state should be updated if it passes, or `None` if it fails.
+        """
+        raise NotImplementedError
+
+    async def _aplan(self, ctx, command=None) -> list | None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _apply(passed: list | None, ctx, command=None) -> bool:
+        if passed is None:
+            return False
+
+        for rule in passed:
+            rule.commit(ctx, command)
+        return True
+
+    def __and__(self, other):
+        return AllRules(self, other)
+
+    def __or__(self, other):
+        return AnyRule(self, other)
+
+    def __invert__(self):
+        return NotRule(self)
+
 class _dfr:
+    needs_await = False
+
     def emit(self, *args, **kwargs) -> bool:
         return True
 
+    async def aemit(self, *args, **kwargs) -> bool:
+        return True
+
 # export
 DEFAULT_RULE = _dfr()
 
 # export
-class CommandRule:
+class CommandRule(_Composable):
     """
     Represents a command rule. The specification depends on the rule type.
 
     ## cooldown
     Represents a command cooldown. The user should wait until the cooldown (in seconds) ends, or else a specific command will not work.
 
+    The cooldown and usage states are kept per command and per user; see `CommandRule.key`.
+
     > Arg Requires: `seconds: int`
 
     ```py
@@ -69,11 +152,26 @@ class CommandRule:
     )
     ```
 
+    For both `except` and `for`, `users` is frozen into a set when the rule is created, so checking a user takes constant time. Besides a list, `users` could also be:
+
+    - a file path (`str` or `os.PathLike`) — one user id per line; empty lines and lines starting with `#` are ignored.
+    - any iterable or iterator of user ids.
+    - a function that returns user ids, which is called again by `reload()`.
+
+    Use `rule.reload()` to re-read the source, or `rule.reload(new_source)` to replace it. The new set is swapped in at once; the cog does not need to be rebuilt.
+
+    ```py
+    admins = CommandRule(rule='for', users='admins.txt')
+    admins.reload() # after editing admins.txt
+    ```
+
     ## based.custom
     Based on your custom rule. Linelib will not touch anything from your function.
 
     > Arg Requires: No additional arguments required for this condition.
 
+    > Optional: `cache_ttl: int` (seconds) — cache the result per user for this long, so repeated checks within a burst don't call the handler again. `cache_size: int` limits the number of cached users. (default: `1024`)
+
     ```py
     class MyRule(CommandRule):
       def handler(self, ctx):
@@ -82,11 +180,25 @@ class CommandRule:
     MyRule(rule='based.custom') # now it's a valid rule.
     ```
 
+    The handler could also be an async function, for example, to look something up in a database:
+
+    ```py
+    class IsMember(CommandRule):
+      async def handler(self, ctx):
+        return await db.is_member(ctx.author.id)
+
+    IsMember(rule='based.custom', cache_ttl=30)
+    ```
+
+    Cog commands await it for you. To check such a rule yourself, use `await rule.aemit(ctx)` instead of `rule.emit(ctx)`.
+
     ## usage_limit
     Limit a command based on the usage of it. For instance, using a usage limitation for each user, everyone will only be able to use it for a specified time.
 
     > Arg Requires: `times: int`
 
+    > Optional: `reset_after: int` (seconds) — the usage count resets after this long, counting from the first use.
+
     ```py
     # the command could only be used once
     
@@ -95,18 +207,62 @@ class CommandRule:
       times=1
     )
     ```
+
+    ## rate_limit
+    Allow a command to be used at most `times` times within any `seconds`-long (sliding) window. Unlike `cooldown`, short bursts are accepted.
+
+    > Arg Requires: `times: int`, `seconds: int`
+
+    > Optional: `per: Literal['user', 'group', 'global']` — who shares the limit. `'group'` counts a group (or multi-person chat) as a whole; in 1-on-1 chats it is the same as `'user'`. (default: `'user'`)
+
+    ```py
+    # 5 times per minute, for everyone in a group together
+    CommandRule(
+      rule='rate_limit',
+      times=5,
+      seconds=60,
+      per='group'
+    )
+    ```
+
+    ## State
+    Each rule keeps its own state (cooldowns, usage counts, ...), per command and user. Rules are numbered in the order they're created, so workers that build the same cogs share state through a `StateBackend`. If that order may differ, give stateful rules a `name`:
+
+    ```py
+    CommandRule(rule='cooldown', seconds=10, name='ask-cooldown')
+    ```
+
+    ## Combining rules
+    Rules can be combined with `&` (and), `|` (or) and `~` (not). Cheap rules (`for`, `except`) are checked before stateful ones (`cooldown`, `usage_limit`, `rate_limit`), and a stateful rule only counts a use when the whole combination passes.
+
+    ```py
+    CommandRule(rule='for', users=admins) & CommandRule(rule='cooldown', seconds=10)
+    ```
     """
     rule: str
 
-    def __init__(self, *, rule: Literal["cooldown", "except", "for", "based.custom", "usage_limit"], **variations):
+    def __init__(self, *, rule: Literal["cooldown", "except", "for", "based.custom", "usage_limit", "rate_limit"], **variations):
         if not rule in VALID_RULES:
             raise ValueError(f"\n\nThe rule type '{rule}' does not exist. Consider checking your spelling.\nHere's a complete list of valid rules for your reference:\n\n{', '.join(VALID_RULES)}")
 
         if not all(arg in variations for arg in VALID_RULES[rule]):
             raise ValueError(f'\n\nSeems like you might have forgotten to pass in some arguments for the command rule \'{rule}\'. This requires the following arguments to be passed:\n\n{", ".join(VALID_RULES[rule])}\n\n')
 
+        if rule == 'rate_limit' and variations.get('per', 'user') not in RATE_LIMIT_SCOPES:
+            raise ValueError(f"\n\nThe rate limit scope '{variations.get('per')}' does not exist. Use one of: {', '.join(RATE_LIMIT_SCOPES)}")
+
         self.rule_str = rule
         self.kwargs = variations
+        # the state of each rule is its own; numbered in creation order, so it's the same in every worker process
+        self.name = variations.get('name', None) or f"{rule}#{next(_RULE_IDS)}"
+
+        if rule in ('except', 'for'):
+            self.source = variations['users']
+            self.reload()
+
+        if rule == 'based.custom' and variations.get('cache_ttl', None):
+            # user id => result
+            self._ll_results = TTLCache(variations.get('cache_size', 1024), variations['cache_ttl'])
 
     def __init_subclass__(cls):
         """
@@ -124,54 +280,297 @@ class CommandRule:
         """
         cls.rule_str = 'based.custom'
 
-    def emit(self, ctx) -> bool:
+    def check(self, ctx, command=None) -> bool:
+        """
+        Whether the rule passes. This does not change any state.
+        """
+        if self.rule_str == "based.custom":
+            return self._check_custom(ctx)
+
         return {
-            "based.custom": self.handler,
-            "cooldown": self.cooldown,
+            "cooldown": self._check_cooldown,
             "except": self._except,
             "for": self._for,
-            "usage_limit": self.usage_limit
-        }[self.rule_str](ctx)
+            "usage_limit": self._check_usage_limit,
+            "rate_limit": self._check_rate_limit
+        }[self.rule_str](ctx, command)
+
+    async def acheck(self, ctx, command=None) -> bool:
+        if self.rule_str == "based.custom":
+            return await self._acheck_custom(ctx)
+        return self.check(ctx, command)
+
+    def _plan(self, ctx, command=None) -> list | None:
+        return [self] if self.check(ctx, command) else None
+
+    async def _aplan(self, ctx, command=None) -> list | None:
+        return [self] if await self.acheck(ctx, command) else None
+
+    def commit(self, ctx, command=None) -> None:
+        """
+        Updates the state of a stateful rule after it has passed.
+        """
+        commit = {
+            "cooldown": self._commit_cooldown,
+            "usage_limit": self._commit_usage_limit,
+            "rate_limit": self._commit_rate_limit
+        }.get(self.rule_str, None)
+
+        if commit:
+            commit(ctx, command)
+
+    @property
+    def cost(self) -> int:
+        """
+        How expensive the rule is to check. Combined rules check the cheaper ones first.
+        """
+        return RULE_COSTS.get(self.rule_str, 1)
+
+    @property
+    def needs_await(self) -> bool:
+        """
+        Whether the rule may have to await a custom handler. (see `aemit`)
+        """
+        return self.rule_str == "based.custom"
+
+    def key(self, ctx, command=None) -> tuple:
+        """
+        The key of the rule state: `(rule name, command name, user id)`.
+
+        A rule checked without a command (`command=None`) shares one state across every such check.
+        """
+        return (self.name, getattr(command, 'name', None), ctx.author.id)
 
     def handler(self, ctx) -> bool:
         return True # default, rewritable.
+
+    def _check_custom(self, ctx) -> bool:
+        cached = self._cached(ctx)
+        if cached is not None:
+            return cached
+
+        result = self.handler(ctx)
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close() # never awaited, on purpose
+            raise UsageError(
+                "Usage Error", f"The handler of '{type(self).__name__}' is async. Use `await rule.aemit(ctx)` (or `acheck`) instead of `emit` (or `check`)."
+            )
+        return self._remember(ctx, result)
+
+    async def _acheck_custom(self, ctx) -> bool:
+        cached = self._cached(ctx)
+        if cached is not None:
+            return cached
+
+        result = self.handler(ctx)
+        if inspect.isawaitable(result):
+            result = await result
+        return self._remember(ctx, result)
+
+    def _cached(self, ctx) -> bool | None:
+        results = getattr(self, '_ll_results', None)
+        return None if results is None else results.get(ctx.author.id, None)
+
+    def _remember(self, ctx, result) -> bool:
+        result = bool(result)
+        results = getattr(self, '_ll_results', None)
+        if results is not None:
+            results[ctx.author.id] = result
+        return result
     
-    def cooldown(self, ctx) -> bool:
-        AUTHOR_ID = ctx.author.id
-        
-        status: int | None = Tmp.rule_cooldown.get(AUTHOR_ID, None)
-        if not status:
-            Tmp.rule_cooldown[AUTHOR_ID] = time.time()
-            print(Tmp.rule_cooldown)
-            return True
+    def cooldown(self, ctx, command=None) -> bool:
+        if not self._check_cooldown(ctx, command):
+            return False
 
-        result: bool = (time.time() - status) >= self.kwargs['seconds']
+        self._commit_cooldown(ctx, command)
+        return True
 
-        if result: # if True:
-            Tmp.rule_cooldown[AUTHOR_ID] = time.time() # reset
-        
-        return result
+    def _check_cooldown(self, ctx, command=None) -> bool:
+        return not self.key(ctx, command) in Tmp.rule_cooldown # still cooling down?
 
-    def _except(self, ctx) -> bool:
-        return not ctx.author.id in self.kwargs['users']
+    def _commit_cooldown(self, ctx, command=None) -> None:
+        # the entry expires (and is reclaimed) once the cooldown ends
+        Tmp.rule_cooldown.set(self.key(ctx, command), time.time(), ttl=self.kwargs['seconds'])
 
-    def _for(self, ctx) -> bool:
-        return ctx.author.id in self.kwargs['users']
+    def reload(self, source=None) -> frozenset:
+        """
+        (Re)loads the users of an `except` or `for` rule from `source` (or the current source), then swaps them in at once.
+        """
+        if source is not None:
+            self.source = source
+
+        source = self.source
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'r', encoding='utf-8') as file:
+                users = frozenset(
+                    line for line in (raw.strip() for raw in file) if line and not line.startswith('#')
+                )
+        elif callable(source):
+            users = frozenset(source())
+        elif isinstance(source, Iterator) and getattr(self, 'users', None) is not None:
+            return self.users # already consumed; keep the current users
+        else:
+            users = frozenset(source)
+
+        # a single assignment: checks see either the old or the new set
+        self.users = self.kwargs['users'] = users
+        return users
+
+    def _except(self, ctx, command=None) -> bool:
+        return not ctx.author.id in self.users
+
+    def _for(self, ctx, command=None) -> bool:
+        return ctx.author.id in self.users
+
+    def usage_limit(self, ctx, command=None) -> bool:
+        if not self._check_usage_limit(ctx, command):
+            return False
+
+        self._commit_usage_limit(ctx, command)
+        return True
 
-    def usage_limit(self, ctx) -> bool:
-        AUTHOR_ID = ctx.author.id
-        status = Tmp.rule_usage.get(AUTHOR_ID, None) # times
+    def _check_usage_limit(self, ctx, command=None) -> bool:
+        status, _ = Tmp.rule_usage.get(self.key(ctx, command), (0, None)) # times
+        return status < self.kwargs['times']
 
-        if not status:
-            Tmp.rule_usage[AUTHOR_ID] = 1
+    def _commit_usage_limit(self, ctx, command=None) -> None:
+        KEY = self.key(ctx, command)
+        reset_after = self.kwargs.get('reset_after', None) # lifetime usage by default
+        status, reset_at = Tmp.rule_usage.get(KEY, (0, None))
 
-            return True # passed!
+        if reset_after is not None and reset_at is None:
+            reset_at = time.time() + reset_after
 
-        if status > self.kwargs['times']:
-            return False # impossible...
+        Tmp.rule_usage.set(KEY, (status + 1, reset_at), ttl=None if reset_at is None else reset_at - time.time())
 
-        # else: (IGNORE)
-        Tmp.rule_usage[AUTHOR_ID] += 1
+    def rate_limit(self, ctx, command=None) -> bool:
+        if not self._check_rate_limit(ctx, command):
+            return False
 
+        self._commit_rate_limit(ctx, command)
         return True
 
+    def _rate_key(self, ctx, command=None) -> tuple:
+        per = self.kwargs.get('per', 'user')
+        if per == 'global':
+            scope = None
+        elif per == 'group':
+            source = ctx._ll_source
+            scope = source.get('groupId') or source.get('roomId') or ctx.author.id
+        else:
+            scope = ctx.author.id
+
+        return (self.name, getattr(command, 'name', None), per, scope)
+
+    def _check_rate_limit(self, ctx, command=None) -> bool:
+        # ring buffer of the last `times` uses; the oldest one decides
+        window = Tmp.rule_rate.get(self._rate_key(ctx, command), None)
+        return window is None or len(window) < window.maxlen or (time.time() - window[0]) >= self.kwargs['seconds']
+
+    def _commit_rate_limit(self, ctx, command=None) -> None:
+        KEY = self._rate_key(ctx, command)
+        window = Tmp.rule_rate.get(KEY, None)
+        if window is None:
+            window = deque(maxlen=self.kwargs['times'])
+
+        window.append(time.time())
+        # the whole window is stale `seconds` after the last use
+        Tmp.rule_rate.set(KEY, window, ttl=self.kwargs['seconds'])
+
+
+class AllRules(_Composable):
+    """
+    Passes when every rule passes. (`rule_a & rule_b`)
+
+    Cheap rules are checked first, and checking stops at the first rule that fails. The state of stateful rules is only updated when all of them pass.
+    """
+    def __init__(self, *rules):
+        self.rules = tuple(sorted(rules, key=lambda rule: rule.cost))
+
+    @property
+    def cost(self) -> int:
+        return max(rule.cost for rule in self.rules)
+
+    @property
+    def needs_await(self) -> bool:
+        return any(rule.needs_await for rule in self.rules)
+
+    def _plan(self, ctx, command=None) -> list | None:
+        passed = []
+        for rule in self.rules:
+            plan = rule._plan(ctx, command)
+            if plan is None:
+                return None
+            passed.extend(plan)
+        return passed
+
+    async def _aplan(self, ctx, command=None) -> list | None:
+        passed = []
+        for rule in self.rules:
+            plan = await rule._aplan(ctx, command)
+            if plan is None:
+                return None
+            passed.extend(plan)
+        return passed
+
+    def __and__(self, other):
+        return AllRules(*self.rules, other)
+
+
+class AnyRule(_Composable):
+    """
+    Passes when at least one rule passes. (`rule_a | rule_b`)
+
+    Cheap rules are checked first, and checking stops at the first rule that passes. Only the state of that rule is updated.
+    """
+    def __init__(self, *rules):
+        self.rules = tuple(sorted(rules, key=lambda rule: rule.cost))
+
+    @property
+    def cost(self) -> int:
+        return max(rule.cost for rule in self.rules)
+
+    @property
+    def needs_await(self) -> bool:
+        return any(rule.needs_await for rule in self.rules)
+
+    def _plan(self, ctx, command=None) -> list | None:
+        for rule in self.rules:
+            plan = rule._plan(ctx, command)
+            if plan is not None:
+                return plan # the rule that decided it, checked once
+        return None
+
+    async def _aplan(self, ctx, command=None) -> list | None:
+        for rule in self.rules:
+            plan = await rule._aplan(ctx, command)
+            if plan is not None:
+                return plan
+        return None
+
+    def __or__(self, other):
+        return AnyRule(*self.rules, other)
+
+
+class NotRule(_Composable):
+    """
+    Passes when the rule does not pass. (`~rule`) The state of the rule is never updated.
+    """
+    def __init__(self, rule):
+        self.rule = rule
+
+    @property
+    def cost(self) -> int:
+        return self.rule.cost
+
+    @property
+    def needs_await(self) -> bool:
+        return self.rule.needs_await
+
+    def _plan(self, ctx, command=None) -> list | None:
+        # nothing passed, so nothing is updated
+        return [] if self.rule._plan(ctx, command) is None else None
+
+    async def _aplan(self, ctx, command=None) -> list | None:
+        return [] if await self.rule._aplan(ctx, command) is None else None
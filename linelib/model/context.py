@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import time
 from termcolor import colored
 from typing import Any, Literal
@@ -8,12 +7,12 @@ from typing import Any, Literal
 from .message import WBTextMessage, WBPostback, WBSticker
 
 from ..connect.gate import reply as replyFunc
-from ..connect.fetch import profile, profileAndGroup, getContent
-from ..connect.types import Group, Profile
+from ..connect.fetch import LazyProfile, getContent, group as fetchGroup
+from ..connect.types import Group
 
 from ..exceptions import Usage as UsageError
 
-from .new import TextMessage
+from .new import TextMessage, dumpMessages
 from ..tmp import Tmp
 from ..ext import Depends
 
@@ -33,7 +32,8 @@ class BaseEvent:
   timestamp: int
   ping: float
   queued: bool = False
-  author: Profile
+  author: LazyProfile | None
+  author_id: str | None
   room_type: str
   
   def __init__(self, CAT: str, req: dict) -> BaseEvent:
@@ -50,24 +50,22 @@ class BaseEvent:
     self.replied = False
     self.t_queue = []
 
+    self._ll_source = req['source']
 
-    async def init():
-        if req['source']['type'] == 'user':
-            self.room_type = 'user'
-            
-            self.author = self.user = await profile({
-                  "Authorization": "Bearer " + CAT
-            }, req['source']['userId'])
-            self.get_group = self.fetch_group = None
-        else:
-            self.room_type = 'group' # or multi-persons chat
-            _profile, _groupCoroutineFunc = await profileAndGroup({
-                "Authorization": "Bearer " + CAT
-            }, req['source']['userId'], req['source']['groupId'])
-            self.get_group = self.fetch_group = _groupCoroutineFunc
-            self.author = self.user = _profile
-
-    asyncio.run(init())
+  async def _ll_init(self):
+    source = self._ll_source
+    user_id = source.get('userId', None)
+    self.author_id = user_id
+    self.author = self.user = LazyProfile(self.client.session, user_id, self.client.profile_cache) if user_id else None
+
+    if source['type'] == 'user':
+        self.room_type = 'user'
+        self.get_group = self.fetch_group = None
+    else:
+        self.room_type = 'group' # or multi-persons chat
+
+    if self.author and self.client.eager_author:
+        await self.author
 
   async def get_group(self) -> Group | None:
       """
@@ -75,7 +73,13 @@ class BaseEvent:
 
       Fetches the current group. If this is a normal chatroom, this function does not exist.
       """
-      pass # default
+      group_id = self._ll_source.get('groupId', None)
+      if not group_id:
+          return None
+
+      return await fetchGroup(self.client.session, group_id, self.client.group_cache)
+
+  fetch_group = get_group
 
   async def reply(self, messages: MessageObjects = None, notification_disabled: bool = False, *args, **kwargs):
     """
@@ -105,16 +109,11 @@ class BaseEvent:
         "Usage Error", f"You could only use the reply function once. To send multiple messages, try this:\n\n{colored('await', 'magenta')} ctx.{colored('send', 'yellow')}([\n  message1,\n  message2\n])\n\n"
       )
 
-    for item in range(len(messages)):
-      if isinstance(messages[item], str):
-        messages[item] = TextMessage(messages[item]).json
-        # in case we have to waste our time.
-
-      if not isinstance(messages[item], dict):
-        messages[item] = messages[item].json
-        # the waffle house has found its new host
+    if getattr(self.client, 'outbox', None) is not None:
+      await self.client._ll_outbox('reply', {"rt": self.reply_token, "msgs": dumpMessages(messages), "disabled": notification_disabled})
+      return
 
-    await replyFunc(self.client, self.reply_token, messages, notification_disabled)
+    await replyFunc(self.client, self.reply_token, dumpMessages(messages), notification_disabled)
 
   async def remember(self, key: Any, item: Any):
     Tmp.handle_action[self.TYPE][key] = item
@@ -150,6 +149,9 @@ class PostbackEvent(BaseEvent):
   data: str
   datetime: str | None
   rich_menu: str | None
+  route: str | None
+  args: list[str]
+  payload: dict | None
   TYPE = 'postback'
   
   def __init__(self, client, r):
@@ -159,6 +161,7 @@ class PostbackEvent(BaseEvent):
     self.data: str = self.postback.data
     self.datetime: str | None = self.postback.datetime
     self.rich_menu: str | None = self.postback.rich_menu
+    self.route, self.args, self.payload = client.routes.parse(self.data) # see `@client.route`
 
 class StickerMessageEvent(BaseEvent):
     """
@@ -357,7 +360,7 @@ class SavableFile(BaseEvent):
         Save the document (file).
         """
         # fn: file name
-        fn = await getContent(self.client.headers, self.id)
+        fn = await getContent(self.client.session, self.id)
         return fn
 
 class ImageMessageEvent(SavableFile):
@@ -242,14 +242,18 @@ class HandlableAction:
     self.STORE = {}  # : Empty
 
   async def remember(self, key: Any, item: Any) -> None:
-    Tmp.action_storage[self.DATA] = {}
-    Tmp.action_storage[self.DATA][key] = item
+    # a copy, then stored again: the storage may live outside of this process
+    stored = dict(Tmp.action_storage.get(self.DATA, None) or {})
+    stored[key] = item
+    Tmp.action_storage[self.DATA] = stored
   
   store = remember
 
   def handle(self):
     """
     Handles the action.
+
+    The handler only lives in this process until the button is tapped (or expires). Use `@client.route(...)` for handlers that work across worker processes and restarts.
     """
 
     def wrapper(func, *args, **kwargs):
@@ -781,3 +785,17 @@ def IMMessageAction(text: str, area: ImagemapArea | dict, label: str = None):
     "area": area
   }
 
+
+def dumpMessages(messages: Any) -> List[dict]:
+  """
+  Converts message objects (`TextMessage`, ..., a `str` or a `dict`), or a list of them, into their JSON.
+  """
+  if not isinstance(messages, (list, tuple)):
+    messages = [messages]
+
+  return [
+    TextMessage(message).json if isinstance(message, str) else
+    message if isinstance(message, dict) else
+    message.json
+    for message in messages
+  ]
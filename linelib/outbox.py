@@ -0,0 +1,280 @@
+"""
+A durable outbox of outbound messages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any
+
+from termcolor import colored
+
+from .connect import gate
+
+# const
+prefix = colored('linelib v2', 'light_green')
+KINDS = ('reply', 'push', 'multicast', 'broadcast')
+RATE_WINDOW = 60.0 # seconds, see `Outbox.drain_rate`
+SEND_TIMEOUT = 0.8 # of the lease, see `Outbox.lease`
+COUNT_INTERVAL = 1.0 # seconds between two counts of `backlog` and `dead`
+
+
+class Outbox:
+  """
+  Sends are written to a SQLite database first, then drained by a background worker in batches. A send that fails is retried with a backoff, even after a restart; so every message is delivered at least once.
+
+  Each send has a dedupe key (a UUID by default): a key that is already in the outbox is not added again, and push, multicast and broadcast send it as their `X-Line-Retry-Key`, so LINE accepts a retried send once at most.
+
+  Several processes may share one outbox; a batch is leased to one worker at a time.
+
+  `path` : str
+
+  The database file.
+
+  `batch_size` : int
+
+  Maximum number of sends drained at once.
+
+  `interval` : float
+
+  Seconds between two polls, when the outbox is empty.
+
+  `max_attempts` : int
+
+  Attempts before a send is given up on. (kept as `dead`)
+
+  `backoff` : float
+
+  Seconds before the first retry; doubled after each attempt, up to `max_backoff`.
+
+  `lease` : float
+
+  Seconds a batch belongs to a worker. If the worker dies, another one sends the batch after this. A send that is still in flight after 80% of the lease (e.g., waiting out rate limits) is cancelled and retried later, so that it is never sent by two workers at once.
+  """
+
+  def __init__(self,
+               path: str,
+               *,
+               batch_size: int = 50,
+               interval: float = 0.5,
+               max_attempts: int = 10,
+               backoff: float = 1.0,
+               max_backoff: float = 300.0,
+               lease: float = 60.0):
+    self.path = path
+    self.batch_size = batch_size
+    self.interval = interval
+    self.max_attempts = max_attempts
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.lease = lease
+
+    self.sent: int = 0
+    self.failed: int = 0 # attempts
+    self._sent_at: deque[float] = deque()
+    self._counts: tuple[int, int] = (0, 0) # (backlog, dead), see `count`
+    self._counted_at: float = float('-inf')
+
+    self._lock = threading.Lock() # the database is used from worker threads, see `asyncio.to_thread`
+    self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+    self._db.execute("PRAGMA journal_mode=WAL")
+    self._db.execute(
+      "CREATE TABLE IF NOT EXISTS outbox ("
+      "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+      "attempts INTEGER NOT NULL DEFAULT 0, next_at REAL NOT NULL, dead INTEGER NOT NULL DEFAULT 0, error TEXT)"
+    )
+    self._db.execute("CREATE INDEX IF NOT EXISTS outbox_next ON outbox (dead, next_at)")
+
+    self.client = None
+    self._task: asyncio.Task | None = None
+    self._wake: asyncio.Event | None = None
+
+  def put(self, kind: str, payload: dict, key: str | None = None) -> str:
+    """
+    Writes a send to the outbox, then returns its dedupe key. This blocks on the database; use `await outbox.add(...)` on the event loop.
+    """
+    key = self._insert(kind, payload, key)
+    if self._wake is not None:
+      self._wake.set()
+    return key
+
+  async def add(self, kind: str, payload: dict, key: str | None = None) -> str:
+    """
+    Same as `put`, without blocking the event loop.
+    """
+    key = await asyncio.to_thread(self._insert, kind, payload, key)
+    if self._wake is not None:
+      self._wake.set()
+    return key
+
+  def _insert(self, kind: str, payload: dict, key: str | None = None) -> str:
+    if kind not in KINDS:
+      raise ValueError(f"Unknown kind '{kind}'. (expected one of {KINDS})")
+
+    key = key or str(uuid.uuid4())
+    with self._lock:
+      self._db.execute(
+        "INSERT OR IGNORE INTO outbox (key, kind, payload, next_at) VALUES (?, ?, ?, ?)",
+        (key, kind, json.dumps(payload, ensure_ascii=False), time.time())
+      )
+    return key
+
+  def start(self, client: Any) -> None:
+    """
+    Starts draining with `client` on the running event loop. (Only once.)
+    """
+    if self._task is not None and not self._task.done():
+      return
+
+    self.client = client
+    self._wake = asyncio.Event()
+    self._task = asyncio.get_running_loop().create_task(self._drain())
+
+  def _claim(self) -> list:
+    now = time.time()
+    with self._lock, self._db: # one transaction, so that no other worker takes the same batch
+      self._db.execute("BEGIN IMMEDIATE")
+      rows = self._db.execute(
+        "SELECT id, key, kind, payload, attempts FROM outbox WHERE dead = 0 AND next_at <= ? ORDER BY id LIMIT ?",
+        (now, self.batch_size)
+      ).fetchall()
+      self._db.executemany(
+        "UPDATE outbox SET next_at = ? WHERE id = ?", [(now + self.lease, row[0]) for row in rows]
+      )
+    return rows
+
+  async def _drain(self):
+    while True:
+      try:
+        rows = await asyncio.to_thread(self._claim)
+      except sqlite3.Error as err: # e.g., locked by another worker for too long
+        print(f"\n\n{prefix} - {colored('Exception ~ OUTBOX', 'red')}:\n{err!r}\n\n")
+        rows = []
+
+      if rows:
+        await asyncio.gather(*(self._send(*row) for row in rows))
+
+      if time.monotonic() - self._counted_at >= COUNT_INTERVAL:
+        try:
+          await self.count()
+        except sqlite3.Error:
+          pass # counted again on the next poll
+
+      if not rows:
+        self._wake.clear()
+        try:
+          await asyncio.wait_for(self._wake.wait(), self.interval)
+        except asyncio.TimeoutError:
+          pass
+
+  async def _deliver(self, key: str, kind: str, payload: dict):
+    if kind == 'reply':
+      await gate.reply(self.client, payload['rt'], payload['msgs'], payload['disabled'])
+    elif kind == 'push':
+      await gate.push(self.client, payload['to'], payload['msgs'], payload['disabled'], retryKey(key))
+    elif kind == 'multicast':
+      await gate.multicast(self.client, payload['to'], payload['msgs'], payload['disabled'], retryKey(key))
+    else:
+      await gate.broadcast(self.client, payload['msgs'], payload['disabled'], retryKey(key))
+
+  async def _send(self, row_id: int, key: str, kind: str, payload: str, attempts: int):
+    try:
+      # retries & backoffs (`Limiter`) included; past the lease, another worker may take the send
+      await asyncio.wait_for(self._deliver(key, kind, json.loads(payload)), self.lease * SEND_TIMEOUT)
+    except Exception as err:
+      self.failed += 1
+      attempts += 1
+      # 4xx (other than 429) won't get any better
+      status = getattr(getattr(err, 'response', None), 'status_code', 0)
+      dead = attempts >= self.max_attempts or (400 <= status < 500 and status != 429)
+      delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+      await asyncio.to_thread(
+        self._execute,
+        "UPDATE outbox SET attempts = ?, next_at = ?, dead = ?, error = ? WHERE id = ?",
+        (attempts, time.time() + delay, int(dead), repr(err), row_id)
+      )
+      if dead:
+        print(f"\n\n{prefix} - {colored('Exception ~ OUTBOX', 'red')} (gave up on '{key}'):\n{err!r}\n\n")
+      return
+
+    await asyncio.to_thread(self._execute, "DELETE FROM outbox WHERE id = ?", (row_id, ))
+    self.sent += 1
+    self._sent_at.append(time.monotonic())
+    self.drain_rate # prunes `_sent_at`
+
+  def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+    with self._lock:
+      return self._db.execute(sql, params)
+
+  async def close(self) -> None:
+    """
+    Stops draining. Sends that are left are drained the next time the outbox starts.
+    """
+    if self._task is not None:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+
+  async def count(self) -> dict:
+    """
+    Counts the sends in the database (of every worker) without blocking the event loop, then returns `{"backlog": ..., "dead": ...}`.
+    """
+    self._counts = await asyncio.to_thread(self._count)
+    self._counted_at = time.monotonic()
+    return {"backlog": self._counts[0], "dead": self._counts[1]}
+
+  def _count(self) -> tuple[int, int]:
+    backlog, dead = self._execute(
+      "SELECT COUNT(*) - COALESCE(SUM(dead), 0), COALESCE(SUM(dead), 0) FROM outbox"
+    ).fetchone()
+    return backlog, dead
+
+  @property
+  def backlog(self) -> int:
+    """
+    Number of sends waiting to be delivered. Counted by the draining worker, at most `COUNT_INTERVAL` seconds ago; use `await outbox.count()` for a fresh count.
+    """
+    return self._counts[0]
+
+  @property
+  def dead(self) -> int:
+    """
+    Number of sends given up on. (counted like `backlog`)
+    """
+    return self._counts[1]
+
+  @property
+  def drain_rate(self) -> float:
+    """
+    Sends delivered per second, over the last minute.
+    """
+    cutoff = time.monotonic() - RATE_WINDOW
+    while self._sent_at and self._sent_at[0] < cutoff:
+      self._sent_at.popleft()
+    return len(self._sent_at) / RATE_WINDOW
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "backlog": self.backlog,
+      "dead": self.dead,
+      "sent": self.sent,
+      "failed": self.failed,
+      "drain_rate": self.drain_rate
+    }
+
+
+def retryKey(key: str) -> str:
+  """
+  A valid `X-Line-Retry-Key` (UUID) of any dedupe key.
+  """
+  try:
+    return str(uuid.UUID(key))
+  except ValueError:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
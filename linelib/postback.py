@@ -0,0 +1,174 @@
+"""
+Named postback routes.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import re
+from typing import Any, Callable
+from urllib.parse import quote, unquote
+
+from .exceptions import Invalid
+
+# const
+PREFIX = "@"
+SEPARATOR = "/"
+PACKED = "!" # signed payloads (see `Route.pack`)
+SIGNATURE_SIZE = 12 # bytes of the HMAC-SHA256 kept, 16 characters
+MAX_DATA = 300 # characters, limited by LINE
+VALID_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+class Route:
+  """
+  A named postback route, registered with `@client.route(...)`.
+
+  `name` : str
+
+  The route ID, carried by the postback `data`.
+
+  `func` : Callable
+
+  The (async) handler. Called with the context and the arguments (or payload) of the `data`.
+  """
+
+  def __init__(self, name: str, func: Callable, table: RouteTable | None = None):
+    self.name = name
+    self.func = func
+    self.table = table
+
+  def data(self, *args: Any) -> str:
+    """
+    The postback `data` of this route with `args`. (e.g., `PostbackAction(data=vote.data('yes'))`)
+    """
+    return _checkSize(self.name, PREFIX + SEPARATOR.join([self.name, *(quote(str(arg), safe='') for arg in args)]))
+
+  def pack(self, **payload: Any) -> str:
+    """
+    The signed postback `data` of this route with a small, typed `payload`. (anything JSON can hold: `str`, `int`, `float`, `bool`, `None`, `list`, `dict`)
+
+    The handler gets the payload back as keyword arguments (`ctx.payload`), without any server-side state. Data that was not signed by this client is ignored.
+
+    ```py
+    PostbackAction(label="Yes", data=vote.pack(poll=12, choice="yes"))
+    ```
+    """
+    try:
+      body = _b64encode(json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    except (TypeError, ValueError) as err:
+      raise Invalid("Invalid Postback Data", f"The payload of route '{self.name}' could not be encoded: {err}")
+
+    return _checkSize(self.name, f"{PACKED}{self.name}.{body}.{self.table.sign(self.name, body)}")
+
+  async def emit(self, ctx, *args: str, **payload: Any):
+    await self.func(ctx, *args, **payload)
+
+  def __repr__(self) -> str:
+    return f"<Route name={self.name!r}>"
+
+
+class RouteTable:
+  """
+  Every postback route of a client. (`Client.routes`)
+
+  The route is looked up from the `data` of a postback, so a tap is handled by any worker process, and after a restart, as long as the route is registered there.
+
+  `secret` : str
+
+  The key that signs packed payloads. (default of `Client`: the channel secret, or the `postback_secret` option)
+  """
+
+  def __init__(self, secret: str = ""):
+    self.routes: dict[str, Route] = {}
+    self.secret = secret.encode('utf-8')
+
+  def add(self, name: str, func: Callable) -> Route:
+    if not VALID_NAME.fullmatch(name):
+      raise Invalid(
+        "Invalid Route",
+        f"The route name '{name}' is not valid. Use letters, digits, '_', '.' or '-' only."
+      )
+
+    if name in self.routes:
+      raise Invalid("Invalid Route", f"The route '{name}' already exists.")
+
+    route = self.routes[name] = Route(name, func, self)
+    return route
+
+  def data(self, name: str, *args: Any) -> str:
+    return self.routes[name].data(*args)
+
+  def pack(self, name: str, **payload: Any) -> str:
+    return self.routes[name].pack(**payload)
+
+  def sign(self, name: str, body: str) -> str:
+    digest = hmac.new(self.secret, f"{name}.{body}".encode('utf-8'), hashlib.sha256).digest()
+    return _b64encode(digest[:SIGNATURE_SIZE])
+
+  def parse(self, data: str | None) -> tuple[str | None, list[str], dict | None]:
+    """
+    Parses the postback `data` of a route into `(name, args, payload)`. Other data, or a packed payload with a bad signature, returns `(None, [], None)`.
+    """
+    if not data:
+      return None, [], None
+
+    if data.startswith(PACKED):
+      try:
+        name, body, signature = data[len(PACKED):].rsplit('.', 2)
+      except ValueError:
+        return None, [], None
+
+      if not VALID_NAME.fullmatch(name) or not hmac.compare_digest(signature.encode('utf-8'), self.sign(name, body).encode('utf-8')):
+        return None, [], None # not ours, or tampered with
+
+      try:
+        payload = json.loads(_b64decode(body))
+      except ValueError:
+        return None, [], None
+      return name, [], payload
+
+    if not data.startswith(PREFIX):
+      return None, [], None
+
+    name, *args = data[len(PREFIX):].split(SEPARATOR)
+    if not VALID_NAME.fullmatch(name):
+      return None, [], None
+    return name, [unquote(arg) for arg in args], None
+
+  async def dispatch(self, ctx) -> bool:
+    """
+    Emits the route of a postback context (if any), then returns whether a route was found.
+    """
+    route = self.routes.get(getattr(ctx, 'route', None))
+    if route is None:
+      return False
+
+    await route.emit(ctx, *ctx.args, **(ctx.payload or {}))
+    return True
+
+  def __contains__(self, name: str) -> bool:
+    return name in self.routes
+
+  def __len__(self) -> int:
+    return len(self.routes)
+
+
+def _checkSize(name: str, data: str) -> str:
+  if len(data) > MAX_DATA:
+    raise Invalid(
+      "Invalid Postback Data",
+      f"The postback data of route '{name}' is {len(data)} characters long. (max: {MAX_DATA})"
+    )
+  return data
+
+
+def _b64encode(raw: bytes) -> str:
+  return base64.urlsafe_b64encode(raw).rstrip(b"=").decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+  return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
@@ -0,0 +1,338 @@
+"""
+State backends of `Tmp`. (rule states, stored action items, ...)
+"""
+
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Iterator
+
+from termcolor import colored
+
+from .cache import TTLCache
+
+# const
+prefix = colored('linelib v2', 'light_green')
+_MISSING = object()
+_DELETE = object()
+PROTOCOL = 4 # fixed, so the same key is always pickled into the same bytes
+
+
+class StateBackend:
+  """
+  Where `Tmp` keeps its state. A backend hands out namespaces, each of which behaves like a `TTLCache`. (`get`, `set`, `pop`, `expire`, `in`, `len`, ...)
+
+  Pass one to the client, or use `Tmp.use(backend)`:
+
+  ```py
+  client = Client(..., state=SQLiteBackend("state.db"))
+  ```
+  """
+
+  def namespace(self, name: str, maxsize: int | None = None, ttl: float | None = None) -> TTLCache:
+    raise NotImplementedError
+
+  def flush(self) -> None:
+    """
+    Writes every pending change. (if any)
+    """
+    pass
+
+  def close(self) -> None:
+    self.flush()
+
+
+class MemoryBackend(StateBackend):
+  """
+  Keeps the state in this process. (default)
+
+  Nothing is shared with other processes, and everything is lost on restart.
+  """
+
+  def namespace(self, name: str, maxsize: int | None = None, ttl: float | None = None) -> TTLCache:
+    return TTLCache(maxsize, ttl)
+
+
+class SQLiteBackend(StateBackend):
+  """
+  Keeps the state in a SQLite database (WAL mode), shared by every local worker process that uses the same `path`, and kept across restarts.
+
+  Keys and values are pickled. Recently used keys are cached in-process for `hot_ttl` seconds, and writes are batched then flushed in the background, so the database is not on the critical path of a webhook.
+
+  `path` : str
+
+  The database file.
+
+  `hot_ttl` : float
+
+  Seconds a key (or a missing key) is read from the in-process cache before the database is asked again. Other processes may see a change up to `hot_ttl + flush_interval` seconds late. (default: `1.0`)
+
+  `hot_size` : int
+
+  Maximum number of keys cached in-process, per namespace. (default: `4096`)
+
+  `flush_interval` : float
+
+  Seconds between two batched writes. (default: `0.05`)
+
+  `batch_size` : int
+
+  Pending writes that wake the flusher right away. (default: `256`)
+
+  Every write to the database happens in the flusher thread. Removing expired entries and counting them (`expire()`, `len()`) do block on the database; `Client.sweeper` runs them in a worker thread.
+  """
+
+  def __init__(self,
+               path: str,
+               *,
+               hot_ttl: float = 1.0,
+               hot_size: int = 4096,
+               flush_interval: float = 0.05,
+               batch_size: int = 256):
+    self.path = path
+    self.hot_ttl = hot_ttl
+    self.hot_size = hot_size
+    self.flush_interval = flush_interval
+    self.batch_size = batch_size
+
+    self.flushes: int = 0
+    self.written: int = 0
+
+    self._lock = threading.RLock() # `_pending` only, never held while the database is written
+    self._flush_lock = threading.RLock() # one writer at a time
+    self._pending: dict[tuple[str, bytes], tuple[Any, float | None]] = {}
+    self._flushing: dict[tuple[str, bytes], tuple[Any, float | None]] = {} # being written
+    self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+    self._db.execute("PRAGMA journal_mode=WAL")
+    self._db.execute("PRAGMA synchronous=NORMAL")
+    self._db.execute(
+      "CREATE TABLE IF NOT EXISTS state ("
+      "ns TEXT NOT NULL, key BLOB NOT NULL, value BLOB NOT NULL, expires REAL, updated REAL NOT NULL, "
+      "PRIMARY KEY (ns, key))"
+    )
+
+    self._closed = threading.Event()
+    self._wake = threading.Event() # a full batch
+    self._thread = threading.Thread(target=self._flusher, name="linelib-state", daemon=True)
+    self._thread.start()
+
+  def namespace(self, name: str, maxsize: int | None = None, ttl: float | None = None) -> SQLiteNamespace:
+    return SQLiteNamespace(self, name, maxsize, ttl)
+
+  def _flusher(self):
+    while not self._closed.is_set():
+      self._wake.wait(self.flush_interval)
+      self._wake.clear()
+      try:
+        self.flush()
+      except sqlite3.Error as err: # e.g., locked by another process for too long; the batch is kept
+        print(f"\n\n{prefix} - {colored('Exception ~ STATE', 'red')}:\n{err!r}\n\n")
+
+  def _write(self, ns: str, key: bytes, value: Any, expires: float | None) -> None:
+    with self._lock:
+      self._pending[(ns, key)] = (value, expires)
+      full = len(self._pending) >= self.batch_size
+
+    if full:
+      self._wake.set() # never on the caller's thread, which may be the event loop
+
+  def _read(self, ns: str, key: bytes) -> tuple[float | None, Any] | Any:
+    with self._lock:
+      item = self._pending.get((ns, key), _MISSING)
+      if item is _MISSING:
+        item = self._flushing.get((ns, key), _MISSING)
+
+    if item is _MISSING:
+      item = self._db.execute(
+        "SELECT value, expires FROM state WHERE ns = ? AND key = ?", (ns, key)
+      ).fetchone()
+      if item is None:
+        return _MISSING
+      item = (pickle.loads(item[0]), item[1])
+
+    value, expires = item
+    if value is _DELETE or (expires is not None and expires <= time.time()):
+      return _MISSING
+    return (expires, value)
+
+  def flush(self) -> None:
+    with self._flush_lock:
+      with self._lock:
+        if not self._pending:
+          return
+        # swap, so that reads and writes go on while the batch is written
+        pending = self._flushing = self._pending
+        self._pending = {}
+
+      try:
+        now = time.time()
+        with self._db: # one transaction
+          self._db.execute("BEGIN IMMEDIATE")
+          self._db.executemany(
+            "DELETE FROM state WHERE ns = ? AND key = ?",
+            [key for key, (value, _) in pending.items() if value is _DELETE]
+          )
+          self._db.executemany(
+            "INSERT OR REPLACE INTO state (ns, key, value, expires, updated) VALUES (?, ?, ?, ?, ?)",
+            [
+              (ns, key, pickle.dumps(value, PROTOCOL), expires, now)
+              for (ns, key), (value, expires) in pending.items() if value is not _DELETE
+            ]
+          )
+      except sqlite3.Error:
+        with self._lock: # keep the batch for the next flush; newer writes win
+          self._pending = {**pending, **self._pending}
+        raise
+      finally:
+        with self._lock:
+          self._flushing = {}
+
+      self.flushes += 1
+      self.written += len(pending)
+
+  def close(self) -> None:
+    self._closed.set()
+    self._wake.set()
+    self._thread.join()
+    with self._flush_lock:
+      self.flush()
+      self._db.close()
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "pending": len(self._pending),
+      "flushes": self.flushes,
+      "written": self.written
+    }
+
+
+class SQLiteNamespace:
+  """
+  A namespace of a `SQLiteBackend`. Behaves like a `TTLCache`, except that `maxsize` is only applied by `expire()`. (e.g., by `Client.sweeper`)
+  """
+  blocking = True # `expire()` and `len()` query the database, see `Sweeper`
+
+  def __init__(self, backend: SQLiteBackend, name: str, maxsize: int | None = None, ttl: float | None = None):
+    self.backend = backend
+    self.name = name
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.hot = TTLCache(backend.hot_size, backend.hot_ttl)
+
+  @property
+  def hits(self) -> int:
+    return self.hot.hits
+
+  @property
+  def misses(self) -> int:
+    return self.hot.misses
+
+  def _lookup(self, key: Hashable) -> Any:
+    # hot entries are kept as (expires, value), so they expire in time even when cached
+    item = self.hot.get(key, None)
+    if item is None:
+      item = self.backend._read(self.name, pickle.dumps(key, PROTOCOL))
+      if item is _MISSING:
+        item = (None, _MISSING) # misses are cached too, for `hot_ttl`
+      self.hot.set(key, item)
+
+    expires, value = item
+    if expires is not None and expires <= time.time():
+      self.hot.pop(key)
+      return _MISSING
+    return value
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    value = self._lookup(key)
+    return default if value is _MISSING else value
+
+  def set(self, key: Hashable, value: Any, ttl: float | None = _MISSING) -> None:
+    ttl = self.ttl if ttl is _MISSING else ttl
+    expires = None if ttl is None else time.time() + ttl
+    self.hot.set(key, (expires, value))
+    self.backend._write(self.name, pickle.dumps(key, PROTOCOL), value, expires)
+
+  def pop(self, key: Hashable, default: Any = None) -> Any:
+    value = self._lookup(key)
+    self.hot.set(key, (None, _MISSING))
+    self.backend._write(self.name, pickle.dumps(key, PROTOCOL), _DELETE, None)
+    return default if value is _MISSING else value
+
+  def expire(self) -> int:
+    """
+    Removes every expired entry (and the oldest ones over `maxsize`) from the database, then returns how many were removed.
+    """
+    backend = self.backend
+    with backend._flush_lock:
+      backend.flush()
+      with backend._db:
+        removed = backend._db.execute(
+          "DELETE FROM state WHERE ns = ? AND expires IS NOT NULL AND expires <= ?", (self.name, time.time())
+        ).rowcount
+        if self.maxsize is not None:
+          removed += backend._db.execute(
+            "DELETE FROM state WHERE ns = ? AND key IN ("
+            "SELECT key FROM state WHERE ns = ? ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+            (self.name, self.name, self.maxsize)
+          ).rowcount
+    # `hot` is bounded, and expires on read; it is not touched here, as this may run in a worker thread
+    return removed
+
+  def clear(self) -> None:
+    backend = self.backend
+    with backend._flush_lock:
+      backend.flush()
+      with backend._db:
+        backend._db.execute("DELETE FROM state WHERE ns = ?", (self.name, ))
+    self.hot.clear()
+
+  @property
+  def stats(self) -> dict:
+    return {
+      "size": len(self),
+      "maxsize": self.maxsize,
+      "ttl": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses
+    }
+
+  def __getitem__(self, key: Hashable) -> Any:
+    value = self._lookup(key)
+    if value is _MISSING:
+      raise KeyError(key)
+    return value
+
+  def __setitem__(self, key: Hashable, value: Any) -> None:
+    self.set(key, value)
+
+  def __delitem__(self, key: Hashable) -> None:
+    if self._lookup(key) is _MISSING:
+      raise KeyError(key)
+    self.pop(key)
+
+  def __contains__(self, key: Hashable) -> bool:
+    return self._lookup(key) is not _MISSING
+
+  def __len__(self) -> int:
+    backend = self.backend
+    with backend._flush_lock:
+      backend.flush()
+      return backend._db.execute(
+        "SELECT COUNT(*) FROM state WHERE ns = ? AND (expires IS NULL OR expires > ?)", (self.name, time.time())
+      ).fetchone()[0]
+
+  def __iter__(self) -> Iterator[Hashable]:
+    backend = self.backend
+    with backend._flush_lock:
+      backend.flush()
+      rows = backend._db.execute(
+        "SELECT key FROM state WHERE ns = ? AND (expires IS NULL OR expires > ?)", (self.name, time.time())
+      ).fetchall()
+    return iter([pickle.loads(key) for key, in rows])
+
+  def __repr__(self) -> str:
+    return f"<SQLiteNamespace name={self.name!r} maxsize={self.maxsize} ttl={self.ttl}>"
@@ -2,13 +2,39 @@
 Temporary database. This functionality was named `database` in the earlier version.
 """
 
+from .cache import TTLCache
+from .state import StateBackend
+
 class Tmp:
     """
     Temporary Database / Storage.
     """
     handle_action = {}
-    action_storage = {} # :Empty
-    self_handler = {} # :Empty
+    # postback data => stored items / handler; untapped buttons expire (see `Client` options)
+    action_storage = TTLCache(maxsize=10000, ttl=86400.0)
+    self_handler = TTLCache(maxsize=10000, ttl=86400.0)
     
-    rule_cooldown = {}
-    rule_usage = {}
\ No newline at end of file
+    # (rule, command name, user id) => state; entries expire on their own
+    rule_cooldown = TTLCache(maxsize=None, ttl=None)
+    rule_usage = TTLCache(maxsize=None, ttl=None)
+    rule_rate = TTLCache(maxsize=None, ttl=None)
+
+    # webhook event ids already handled (see `Client` options)
+    seen_events = TTLCache(maxsize=100000, ttl=3600.0)
+
+    # where the state above is kept (see `use`)
+    backend: StateBackend | None = None
+
+    @classmethod
+    def use(cls, backend: StateBackend) -> None:
+        """
+        Keeps `action_storage` and the rule states in `backend` from now on, e.g., to share them between worker processes.
+
+        `handle_action` and `self_handler` hold live objects (handlers, mutable dicts), so they always stay in this process.
+        """
+        cls.backend = backend
+        cls.action_storage = backend.namespace('action_storage', cls.action_storage.maxsize, cls.action_storage.ttl)
+        cls.rule_cooldown = backend.namespace('rule_cooldown')
+        cls.rule_usage = backend.namespace('rule_usage')
+        cls.rule_rate = backend.namespace('rule_rate')
+        cls.seen_events = backend.namespace('seen_events', cls.seen_events.maxsize, cls.seen_events.ttl)
\ No newline at end of file